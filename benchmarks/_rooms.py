@@ -0,0 +1,49 @@
+"""ベンチマーク用: 各ゲームモードの進行中ルームを作る"""
+import os
+import sys
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # data/content.pack はカレントディレクトリ基準
+
+from game_engine import GameEngine  # noqa: E402
+from models import Room, GameMode  # noqa: E402
+
+engine = GameEngine()
+
+MODES = [mode.value for mode in GameMode]
+
+
+def build_room(mode: str, num_players: int = 30, room_id: str = "BENCH") -> Tuple[Room, List[str]]:
+    """Room in the middle of a round: players joined, secrets dealt, answers/votes in."""
+    room = Room(room_id=room_id)
+    pids = [f"P-{i:03d}" for i in range(num_players)]
+    for i, pid in enumerate(pids):
+        engine.process_message(room, pid, "JOIN", {"name": f"プレイヤー{i}"})
+    engine.process_message(room, "HOST-1", "START_GAME", {"mode": mode})
+
+    if mode == GameMode.SYMPATHY.value:
+        engine.process_message(room, "HOST-1", "NEXT_ROUND", {})
+        for i, pid in enumerate(pids):
+            engine.process_message(room, pid, "SUBMIT_ANSWER", {"text": f"こたえ{i % 7}"})
+        engine.process_message(room, "HOST-1", "SKIP_TO_JUDGING", {})
+    elif mode == GameMode.WORD_WOLF.value:
+        engine.process_message(room, "HOST-1", "START_DISCUSSION", {})
+        for i, pid in enumerate(pids[:-1]):
+            engine.process_message(room, pid, "VOTE_WOLF", {"target_player_id": pids[(i + 1) % num_players]})
+    elif mode == GameMode.SEKAI_NO_MIKATA.value:
+        for pid in pids[:-1]:
+            engine.process_message(room, pid, "SEKAI_SUBMIT_ANSWER", {"text": "カレー"})
+    elif mode == GameMode.ITO.value:
+        engine.process_message(room, "HOST-1", "NEXT_ROUND", {})
+        for pid in pids[: num_players // 2]:
+            engine.process_message(room, pid, "ITO_PLAY_CARD", {})
+    elif mode == GameMode.ONE_NIGHT_WEREWOLF.value:
+        engine.process_message(room, "HOST-1", "WEREWOLF_START_NIGHT", {})
+        for pid in pids:
+            engine.process_message(room, pid, "WEREWOLF_NIGHT_ACTION", {"action": "werewolf_confirm"})
+        engine.process_message(room, "HOST-1", "WEREWOLF_START_DISCUSSION", {})
+        for i, pid in enumerate(pids):
+            engine.process_message(room, pid, "WEREWOLF_VOTE", {"target_player_id": pids[(i + 1) % num_players]})
+    return room, pids
@@ -0,0 +1,40 @@
+"""
+ゲームモード別: フルスナップショットの deflate 圧縮率とCPUコスト
+
+    python benchmarks/bench_compression.py [players]
+
+本番の実測値は GET /stats の connections.compression を参照。
+"""
+import sys
+import timeit
+import zlib
+
+from _rooms import MODES, build_room
+
+from realtime.compression import COMPRESS_THRESHOLD
+from realtime.encoding import FrameEncoder
+
+
+def deflate(data: bytes, level: int) -> bytes:
+    deflater = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return deflater.compress(data) + deflater.flush()
+
+
+def main():
+    num_players = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    encoder = FrameEncoder()
+    print(f"players={num_players} threshold={COMPRESS_THRESHOLD}B  (host snapshot / player snapshot)")
+    for mode in MODES:
+        room, pids = build_room(mode, num_players)
+        row = [f"{mode:<20}"]
+        for viewer in ("HOST-1", pids[0]):
+            data = encoder.encode({"type": "STATE_UPDATE", "version": room.version, "data": room.get_view(viewer)}).encode()
+            for level in (1, 6):
+                size = len(deflate(data, level))
+                cpu = min(timeit.repeat(lambda: deflate(data, level), number=100, repeat=3)) / 100 * 1e6
+                row.append(f"L{level} {len(data):6d}->{size:5d}B ({size / len(data):.2f}) {cpu:6.1f}us")
+        print("  ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+お題・単語の読み込み時間: CSVパース vs コンパイル済みパック
+
+    python benchmarks/bench_content.py [scale]
+
+scale 倍に水増ししたCSV (既定 1 = 実データ) を一時ディレクトリに作り、
+起動時の読み込みを比較する。
+  csv        : 旧 load_data 相当 (全CSVをパースしてリスト化)
+  open       : パックを開く (ヘッダのみ。起動時に払うのはここだけ)
+  open+mode  : 1モード分のカタログを読む (ゲーム開始時)
+  open+all   : 全カタログの全項目をデコード (最悪ケース)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from content import MODE_CATALOGS, SOURCES, ContentPack, compile_pack, write_pack  # noqa: E402
+from content.sources import read_source  # noqa: E402
+
+REPEAT = 20
+
+
+def make_sources(directory: str, scale: int):
+    for source in SOURCES.values():
+        path = os.path.join(ROOT, source.file)
+        if scale == 1:
+            shutil.copy(path, directory)
+            continue
+        with open(path, encoding="utf-8") as f:
+            header, *rows = f.read().splitlines()
+        with open(os.path.join(directory, source.file), "w", encoding="utf-8") as f:
+            f.write(header + "\n")
+            for i in range(scale):
+                for row in rows:
+                    # 各列に番号を付けて別項目にする
+                    f.write(",".join(f"{col}{i}" for col in row.split(",")) + "\n")
+
+
+def best(fn) -> float:
+    times = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        make_sources(tmp, scale)
+        pack_path = os.path.join(tmp, "content.pack")
+        started = time.perf_counter()
+        write_pack(pack_path, compile_pack(tmp))
+        compile_s = time.perf_counter() - started
+
+        def csv_parse():
+            for name in SOURCES:
+                read_source(name, tmp)
+
+        def open_only():
+            ContentPack.open(pack_path).close()
+
+        def open_mode():
+            pack = ContentPack.open(pack_path)
+            pack.load_mode("SEKAI_NO_MIKATA")
+            pack.close()
+
+        def open_all():
+            pack = ContentPack.open(pack_path)
+            for name in SOURCES:
+                for _ in pack.catalog(name):
+                    pass
+            pack.close()
+
+        pack = ContentPack.open(pack_path)
+        items = sum(pack.stats()["items"].values())
+        pack.close()
+        csv_bytes = sum(os.path.getsize(os.path.join(tmp, s.file)) for s in SOURCES.values())
+        print(f"items {items:,} / CSV {csv_bytes / 1024:.0f} KiB / pack {os.path.getsize(pack_path) / 1024:.0f} KiB"
+              f" / compile {compile_s * 1000:.1f} ms")
+        print(f"(open+mode は {'+'.join(MODE_CATALOGS['SEKAI_NO_MIKATA'])})")
+        baseline = best(csv_parse)
+        for label, fn in (("csv", csv_parse), ("open", open_only), ("open+mode", open_mode), ("open+all", open_all)):
+            elapsed = baseline if fn is csv_parse else best(fn)
+            print(f"{label:<10} {elapsed * 1000:8.3f} ms  ({baseline / elapsed:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+ルーム独自パックのメモリ: ルームごとにコピー vs 共有・intern
+
+    python benchmarks/bench_custom_packs.py [rooms]
+
+rooms 個 (既定 1,000) のルームが、300問 + ワードウルフ60組の会場パックを
+アップロードする。1割のルームは数問だけ差し替えた版を使う。
+  copy   : アップロードされたリストをそのまま各ルームが持つ
+  shared : Room.custom_pack (同じ内容は1インスタンス、文字列は intern)
+"""
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from content import custom_packs  # noqa: E402
+from models import Room  # noqa: E402
+
+
+def upload(room_index: int) -> bytes:
+    questions = [f"会場オリジナルのお題 その{i}：あなたが一番好きなものは？" for i in range(300)]
+    topics = [{"majority": f"多数派ワード{i}", "minority": f"少数派ワード{i}"} for i in range(60)]
+    if room_index % 10 == 0:
+        questions[:3] = [f"ルーム{room_index}だけのお題{j}" for j in range(3)]
+    return json.dumps({"questions": questions, "word_wolf_topics": topics}, ensure_ascii=False).encode()
+
+
+def measure(build) -> int:
+    bodies = [upload(i) for i in range(NUM_ROOMS)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i, body) for i, body in enumerate(bodies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def copy(i: int, body: bytes):
+    return Room(room_id=f"R{i:05d}"), json.loads(body)
+
+
+def shared(i: int, body: bytes):
+    return Room(room_id=f"R{i:05d}", custom_pack=json.loads(body))
+
+
+NUM_ROOMS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+
+
+def main():
+    print(f"{NUM_ROOMS:,} rooms")
+    copied = measure(copy)
+    print(f"copy    {copied / 1024 / 1024:7.2f} MiB")
+    used = measure(shared)
+    print(f"shared  {used / 1024 / 1024:7.2f} MiB  ({copied / used:.1f}x less, packs {custom_packs.stats()})")
+
+
+if __name__ == "__main__":
+    main()
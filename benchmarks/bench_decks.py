@@ -0,0 +1,74 @@
+"""
+重複なしドロー: 旧方式 (毎回 未使用リストを作り直す) vs Deck
+
+    python benchmarks/bench_decks.py [catalog_size] [draws]
+
+catalog_size 件 (既定 100,000) のカタログから draws 回引く。
+  str-list : 旧 Sekai/ito (使用済みを文字列リストで持ち、毎回全件を走査)
+  id-set   : 旧 Sympathy (使用済みセット。走査は毎回全件)
+  deck     : Room.draw (Fisher-Yates を1手ずつ、O(1))
+保存サイズはスナップショット (JSON) での使用済み状態の大きさ。
+"""
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models import Room  # noqa: E402
+
+
+def str_list(catalog, draws, rng):
+    used = []
+    for _ in range(draws):
+        available = [q for q in catalog if q not in used]
+        if not available:
+            used = []
+            available = catalog
+        q = rng.choice(available)
+        used.append(q)
+    return used
+
+
+def id_set(catalog, draws, rng):
+    used = set()
+    for _ in range(draws):
+        available = [i for i in range(len(catalog)) if i not in used]
+        if not available:
+            used = set()
+            available = range(len(catalog))
+        used.add(rng.choice(available))
+    return sorted(used)
+
+
+def deck(catalog, draws, rng):
+    room = Room(room_id="BENCH")
+    room.begin_message(rng.getrandbits(63), 0.0)
+    seen = set()
+    for _ in range(draws):
+        seen.add(room.draw("questions", len(catalog)))
+    assert len(seen) == min(draws, len(catalog))
+    return room.model_dump(mode="json")["decks"]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    draws = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    catalog = [f"お題その{i}（ベンチマーク用の少し長めの文字列）" for i in range(size)]
+    print(f"catalog {size:,} items, {draws:,} draws")
+    print(f"{'':<9} {'total':>10} {'per draw':>12} {'state':>10}")
+    for label, fn, limit in (("str-list", str_list, 20), ("id-set", id_set, 500), ("deck", deck, None)):
+        n = draws if limit is None else min(draws, limit)
+        started = time.perf_counter()
+        state = fn(catalog, n, random.Random(1))
+        elapsed = time.perf_counter() - started
+        note = "" if n == draws else f"  ({n:,} draws only)"
+        print(f"{label:<9} {elapsed * 1000:8.1f} ms {elapsed / n * 1e6:9.1f} µs"
+              f" {len(json.dumps(state, ensure_ascii=False).encode()) / 1024:8.1f} KiB{note}")
+
+
+if __name__ == "__main__":
+    main()
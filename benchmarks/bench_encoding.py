@@ -0,0 +1,54 @@
+"""
+STATE_UPDATE 1フレームあたりのシリアライズ時間
+
+    python benchmarks/bench_encoding.py [players]
+
+legacy: 旧実装（視聴者ごとに model_dump + json.dumps(default=str)）
+json:   Room.get_view + FrameEncoder（orjson、なければ json）
+msgpack: Room.get_view + FrameEncoder(MessagePack)（msgpack がある場合のみ）
+"""
+import json
+import sys
+import timeit
+
+from _rooms import MODES, build_room
+
+from realtime.encoding import FrameEncoder, MSGPACK_SUBPROTOCOL, msgpack
+
+
+def legacy_frame(room, viewer_id):
+    # 旧 get_view 相当のコスト: フルダンプ + default=str
+    return json.dumps({"type": "STATE_UPDATE", "data": room.model_dump()}, default=str)
+
+
+def bench(fn, number=200):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    num_players = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    encoders = {"json": FrameEncoder()}
+    if msgpack is not None:
+        encoders["msgpack"] = FrameEncoder(MSGPACK_SUBPROTOCOL)
+
+    print(f"players={num_players}  (us/frame, bytes/frame)")
+    for mode in MODES:
+        room, pids = build_room(mode, num_players)
+        viewer = pids[0]
+        row = [f"{mode:<20}"]
+
+        frame = legacy_frame(room, viewer)
+        row.append(f"legacy {bench(lambda: legacy_frame(room, viewer)):8.1f}us {len(frame.encode()):6d}B")
+
+        for name, encoder in encoders.items():
+            def encode():
+                room._views = None  # ビュー構築もフレームのコストに含める
+                return encoder.encode({"type": "STATE_UPDATE", "version": room.version, "data": room.get_view(viewer)})
+            frame = encode()
+            size = len(frame) if isinstance(frame, bytes) else len(frame.encode())
+            row.append(f"{name} {bench(encode):8.1f}us {size:6d}B")
+        print("  ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Sympathy の自動グループ分け: 旧方式 (JUDGING 移行時に .lower() で一括) vs 正規化 + 逐次インデックス
+
+    python benchmarks/bench_grouping.py [players]
+
+players 人 (既定 200) が、表記ゆれを含む回答 (全角/半角、カタカナ/ひらがな、
+長音・句読点の有無) を送る。グループ数 (少ないほど手直しが減る) と、
+SUBMIT_ANSWER 1件・SKIP_TO_JUDGING (JUDGING が開くまで) の時間を比べる。
+"""
+import random
+import time
+
+from _rooms import engine
+
+from models import Room
+
+VARIANTS = [
+    ["ラーメン", "らーめん", "ﾗｰﾒﾝ", "ラーメン！", "ラーメン。", "らーめん〜"],
+    ["カレー", "かれー", "ｶﾚｰ", "カレー！！", "カレー "],
+    ["コーヒー", "こーひー", "ｺｰﾋｰ", "コーヒー。", "珈琲"],
+    ["ＵＳＪ", "USJ", "usj", "ＵＳＪ！"],
+    ["寿司", "すし", "スシ", "お寿司", "寿司！"],
+    ["ディズニーランド", "ディズニー　ランド", "でぃずにーらんど", "ﾃﾞｨｽﾞﾆｰﾗﾝﾄﾞ"],
+]
+
+
+def play(num_players: int, seed: int):
+    rng = random.Random(seed)
+    room = Room(room_id="BENCH")
+    pids = [f"P-{i:03d}" for i in range(num_players)]
+    for pid in pids:
+        engine.process_message(room, pid, "JOIN", {"name": pid}, seed=rng.getrandbits(63))
+    engine.process_message(room, "HOST-1", "START_GAME", {"mode": "SYMPATHY"}, seed=rng.getrandbits(63))
+    engine.process_message(room, "HOST-1", "NEXT_ROUND", {}, seed=rng.getrandbits(63))
+    texts = [rng.choice(rng.choice(VARIANTS)) for _ in pids]
+
+    started = time.perf_counter()
+    for pid, text in zip(pids, texts):
+        engine.process_message(room, pid, "SUBMIT_ANSWER", {"text": text}, seed=rng.getrandbits(63))
+    submit_s = (time.perf_counter() - started) / num_players
+    return room, submit_s, rng
+
+
+def old_grouping(room: Room):
+    text_to_group_id = {}
+    for ans_id, answer in room.answers.items():
+        norm_text = answer.raw_text.strip().lower()
+        if norm_text in text_to_group_id:
+            answer.group_id = text_to_group_id[norm_text]
+        else:
+            text_to_group_id[norm_text] = ans_id
+            answer.group_id = ans_id
+
+
+def main():
+    import sys
+    num_players = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{num_players} players, {len(VARIANTS)} intended answers")
+
+    room, _, rng = play(num_players, 1)
+    started = time.perf_counter()
+    old_grouping(room)
+    old_skip = time.perf_counter() - started
+    old_groups = len({a.group_id for a in room.answers.values()})
+
+    room, submit_s, rng = play(num_players, 1)
+    started = time.perf_counter()
+    engine.process_message(room, "HOST-1", "SKIP_TO_JUDGING", {}, seed=rng.getrandbits(63))
+    new_skip = time.perf_counter() - started
+    new_groups = len({a.group_id for a in room.answers.values()})
+
+    print(f"old  groups {old_groups:3}  judging opens after {old_skip * 1000:7.3f} ms (grouping pass)")
+    print(f"new  groups {new_groups:3}  judging opens after {new_skip * 1000:7.3f} ms (whole SKIP_TO_JUDGING),"
+          f" {submit_s * 1e6:.1f} µs per SUBMIT_ANSWER")
+
+
+if __name__ == "__main__":
+    main()
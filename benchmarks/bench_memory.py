@@ -0,0 +1,39 @@
+"""
+ゲームモード別: 進行中ルーム1つあたりのメモリ (tracemalloc)
+
+    python benchmarks/bench_memory.py [rooms] [players]
+
+build_room と同じ手順で rooms 個のルームを作り、生きているルームが
+確保しているバイト数を数える (ビューのキャッシュは含まない)。
+"""
+import gc
+import sys
+import tracemalloc
+
+from _rooms import MODES, build_room
+
+
+def measure(mode: str, num_rooms: int, num_players: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    rooms = [build_room(mode, num_players, room_id=f"M{i}")[0] for i in range(num_rooms)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del rooms
+    return allocated / num_rooms
+
+
+def main():
+    num_rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    num_players = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"rooms={num_rooms} players={num_players}")
+    for mode in MODES:
+        per_room = measure(mode, num_rooms, num_players)
+        print(f"{mode:<20} {per_room / 1024:7.1f} KiB/room")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+再起動時のルーム復元時間 (SQLiteスナップショット)
+
+    python benchmarks/bench_restore.py [rooms] [players]
+
+全モードの進行中ルームを rooms 個スナップショットしてから、起動時と同じ
+SnapshotStore.restore() で読み戻す。
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from _rooms import MODES, build_room
+
+from models import Room
+from store.snapshots import SnapshotStore
+
+
+async def run(num_rooms: int, num_players: int):
+    templates = [build_room(mode, num_players)[0] for mode in MODES]
+    source = {}
+    for i in range(num_rooms):
+        room = templates[i % len(templates)].model_copy(deep=True)
+        room.room_id = f"R{i:05d}"
+        source[room.room_id] = room
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rooms.sqlite3")
+        writer = SnapshotStore(path, source)
+        started = time.perf_counter()
+        written = await writer.flush()
+        write_s = time.perf_counter() - started
+        await writer.close()
+        size = os.path.getsize(path)
+
+        restored_rooms = {}
+        reader = SnapshotStore(path, restored_rooms)
+        started = time.perf_counter()
+        restored = await reader.restore()
+        restore_s = time.perf_counter() - started
+        await reader.close()
+
+    assert restored == num_rooms
+    assert all(isinstance(room, Room) for room in restored_rooms.values())
+    print(f"rooms={num_rooms} players={num_players} file={size / 1024 / 1024:.1f}MiB ({size // num_rooms}B/room)")
+    print(f"snapshot {written} rooms: {write_s * 1000:8.1f}ms ({write_s / num_rooms * 1e6:.1f}us/room)")
+    print(f"restore  {restored} rooms: {restore_s * 1000:8.1f}ms ({restore_s / num_rooms * 1e6:.1f}us/room)")
+
+
+def main():
+    num_rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    num_players = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    asyncio.run(run(num_rooms, num_players))
+
+
+if __name__ == "__main__":
+    main()
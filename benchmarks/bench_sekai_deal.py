@@ -0,0 +1,61 @@
+"""
+セカイノミカタの手札配布: 旧方式 (プレイヤーごとに未使用リストを作り直す) vs 山札
+
+    python benchmarks/bench_sekai_deal.py [rounds]
+
+実データの単語 (sekai_words) で、人数ごとに rounds ラウンド配る時間。
+"""
+import random
+import sys
+import time
+
+from _rooms import engine
+
+from models import Room
+
+
+def old_rounds(words, players, rounds, rng):
+    used_words = []
+    for _ in range(rounds):
+        available_words = [w for w in words if w not in used_words]
+        if len(available_words) < 50:
+            used_words = []
+            available_words = list(words)
+        round_used_words = []
+        for _pid in players[1:]:
+            pool = [w for w in available_words if w not in round_used_words]
+            if len(pool) < 8:
+                pool = available_words.copy()
+            choices = rng.sample(pool, min(8, len(pool)))
+            round_used_words.extend(choices)
+        used_words.extend(round_used_words)
+
+
+def deck_rounds(words, players, rounds, rng):
+    room = Room(room_id="BENCH")
+    for pid in players:
+        engine.process_message(room, pid, "JOIN", {"name": pid}, seed=rng.getrandbits(63))
+    engine.process_message(room, "HOST-1", "START_GAME", {"mode": "SEKAI_NO_MIKATA"}, seed=rng.getrandbits(63))
+    for _ in range(rounds):
+        engine.sekai._start_round(room)
+        hands = room.sekai_state.word_choices
+        assert len({w for hand in hands.values() for w in hand}) == 8 * len(hands)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    words = list(engine.content.catalog("sekai_words"))
+    print(f"{len(words)} words, {rounds} rounds")
+    for num_players in (5, 15, 50):
+        players = [f"P-{i:03d}" for i in range(num_players)]
+        result = []
+        for fn in (old_rounds, deck_rounds):
+            started = time.perf_counter()
+            fn(words, players, rounds, random.Random(1))
+            result.append((time.perf_counter() - started) / rounds)
+        print(f"{num_players:>3} players: old {result[0] * 1000:8.3f} ms/round  deck {result[1] * 1000:7.3f} ms/round"
+              f"  ({result[0] / result[1]:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+シャーディング: シャード数ごとのスループットと、ルームが複数シャードに分かれないことの確認
+
+    python benchmarks/bench_sharding.py [shards,...] [rooms] [players] [messages]
+
+python -m sharding をシャード数ごとに起動し、ルーター経由で各プレイヤーが
+メッセージを送っては STATE_UPDATE を待つ (クローズドループ)。負荷側も
+CPU数ぶんのプロセスに分ける。最後に各シャードの /stats を集計して
+  - 全ルームがちょうど1回ずつ数えられている (分裂なし)
+  - 各シャードのルーム数が shard_for の割り当てと一致する
+  - 所有していないシャードに直接つなぐと拒否される
+を確認する。
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+
+from _rooms import ROOT
+
+import websockets
+
+from sharding import shard_for
+
+PORT = 8790
+SHARD_PORT = 9190
+
+
+def get_json(url: str):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def drive_room(room_id: str, players: int, messages: int) -> int:
+    base = f"ws://127.0.0.1:{PORT}/ws/{room_id}/"
+    clients = [await websockets.connect(base + f"P{i}", compression=None) for i in range(players)]
+    for ws in clients:
+        await ws.recv()  # initial snapshot
+
+    async def play(i, ws):
+        for n in range(messages):
+            await ws.send(json.dumps({"type": "JOIN", "data": {"name": f"p{i}-{n}"}}))
+            await ws.recv()
+
+    await asyncio.gather(*(play(i, ws) for i, ws in enumerate(clients)))
+    for ws in clients:
+        await ws.close()
+    return players * messages
+
+
+def load_worker(room_ids, players, messages, queue):
+    async def run():
+        done = await asyncio.gather(*(drive_room(r, players, messages) for r in room_ids))
+        return sum(done)
+    try:
+        queue.put(asyncio.run(run()))
+    except Exception as e:
+        print(f"load worker failed: {e!r}")
+        queue.put(0)
+
+
+def run_shards(shards: int, rooms: int, players: int, messages: int):
+    env = dict(os.environ, SNAPSHOT_PATH="", EVENT_LOG_PATH="")
+    proc = subprocess.Popen([sys.executable, "-m", "sharding", "--shards", str(shards), "--port", str(PORT),
+                             "--shard-port", str(SHARD_PORT), "--host", "127.0.0.1"], cwd=ROOT, env=env)
+    try:
+        for _ in range(100):
+            try:
+                stats = get_json(f"http://127.0.0.1:{PORT}/stats")
+                if all("error" not in s for s in stats["shards"]):
+                    break
+            except OSError:
+                pass
+            time.sleep(0.1)
+
+        room_ids = [f"BENCH{i:04d}" for i in range(rooms)]
+        workers = os.cpu_count() or 1
+        queue = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=load_worker, args=(room_ids[w::workers], players, messages, queue))
+                 for w in range(workers)]
+        started = time.perf_counter()
+        for p in procs:
+            p.start()
+        total = sum(queue.get() for _ in procs)
+        elapsed = time.perf_counter() - started
+        for p in procs:
+            p.join()
+
+        # No room may live on more than one shard
+        stats = get_json(f"http://127.0.0.1:{PORT}/stats")["shards"]
+        counted = [s["rooms"]["rooms"] for s in stats]
+        expected = Counter(shard_for(r, shards) for r in room_ids)
+        assert sum(counted) == rooms, f"rooms counted {sum(counted)} != {rooms}: a room was split"
+        assert counted == [expected[i] for i in range(shards)], f"{counted} != expected {expected}"
+
+        # Connecting straight to a shard that does not own the room is refused
+        if shards > 1:
+            foreign = next(r for r in room_ids if shard_for(r, shards) != 0)
+
+            async def try_foreign():
+                try:
+                    async with websockets.connect(f"ws://127.0.0.1:{SHARD_PORT}/ws/{foreign}/X"):
+                        return False
+                except Exception:
+                    return True
+            assert asyncio.run(try_foreign()), "shard 0 accepted a room it does not own"
+
+        print(f"shards={shards:<2} {total} msgs in {elapsed:6.2f}s = {total / elapsed:8.0f} msg/s  rooms/shard={counted}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    shard_counts = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1, 2, 4]
+    rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    players = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    messages = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    print(f"cpus={os.cpu_count()} rooms={rooms} players={players} messages/player={messages}")
+    for shards in shard_counts:
+        run_shards(shards, rooms, players, messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+from .custom import CustomPack, custom_packs
+from .pack import Catalog, ContentPack, DEFAULT_PACK_PATH, Item, compile_pack, load_pack, write_pack
+from .sources import CONTENT_DIR, MODE_CATALOGS, SOURCES
+
+__all__ = [
+    'Catalog', 'ContentPack', 'CustomPack', 'Item', 'custom_packs', 'compile_pack', 'load_pack', 'write_pack',
+    'CONTENT_DIR', 'DEFAULT_PACK_PATH', 'MODE_CATALOGS', 'SOURCES',
+]
@@ -0,0 +1,28 @@
+"""
+Compile the content CSVs into a pack (the server also does this on
+startup whenever the pack is missing or older than the CSVs).
+
+    python -m content [--out data/content.pack] [--source DIR]
+"""
+import argparse
+import os
+
+from .pack import DEFAULT_PACK_PATH, ContentPack, compile_pack, write_pack
+from .sources import CONTENT_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.environ.get("CONTENT_PACK_PATH") or DEFAULT_PACK_PATH)
+    parser.add_argument("--source", default=CONTENT_DIR, help="directory holding the CSVs")
+    args = parser.parse_args()
+
+    data = compile_pack(args.source)
+    write_pack(args.out, data)
+    pack = ContentPack(data, args.out)
+    items = ", ".join(f"{name} {count}" for name, count in pack.stats()["items"].items())
+    print(f"📦 {args.out}: {len(data) / 1024:.1f} KiB ({items})")
+
+
+if __name__ == "__main__":
+    main()
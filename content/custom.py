@@ -0,0 +1,127 @@
+"""
+Per-room custom content (a venue's own Sympathy questions and word wolf
+pairs).
+
+A room holds a reference to a CustomPack, never its own copy: packs are
+looked up by a digest of their content, so every room that uploads (or
+is restored with) the same pack shares one instance, and every string is
+interned, so packs that mostly overlap share their common items too.
+The registry holds packs weakly; a pack goes away with the last room
+that references it.
+"""
+import hashlib
+import json
+import sys
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pack import Catalog
+
+# Catalogs a room may replace, with the fields of each item
+CUSTOM_CATALOGS: Dict[str, Tuple[str, ...]] = {
+    "questions": ("question",),
+    "word_wolf_topics": ("majority", "minority"),
+}
+MAX_ITEMS = 500  # per catalog
+MAX_TEXT = 100  # characters per field
+MAX_UPLOAD_BYTES = 64 * 1024
+
+
+class CustomPack:
+    __slots__ = ("pack_id", "catalogs", "__weakref__")
+
+    def __init__(self, pack_id: str, catalogs: Dict[str, Catalog]):
+        self.pack_id = pack_id
+        self.catalogs = catalogs
+
+    def catalog(self, name: str) -> Optional[Catalog]:
+        return self.catalogs.get(name)
+
+    def dump(self) -> Dict[str, list]:
+        """The upload format (what a room snapshot stores)."""
+        return {
+            name: [item if len(catalog.fields) == 1 else dict(zip(catalog.fields, item)) for item in catalog]
+            for name, catalog in self.catalogs.items()
+        }
+
+    def __deepcopy__(self, memo):
+        return self  # immutable and shared
+
+    def __len__(self) -> int:
+        return sum(len(catalog) for catalog in self.catalogs.values())
+
+
+def _field(value: Any, where: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{where}: expected a string")
+    value = value.strip()
+    if not value:
+        raise ValueError(f"{where}: empty")
+    if len(value) > MAX_TEXT:
+        raise ValueError(f"{where}: longer than {MAX_TEXT} characters")
+    return value
+
+
+def validate(data: Any) -> Dict[str, List[Tuple[str, ...]]]:
+    """Checked, stripped, de-duplicated rows per catalog; ValueError says what is wrong."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError(f"expected an object with any of: {', '.join(CUSTOM_CATALOGS)}")
+    rows: Dict[str, List[Tuple[str, ...]]] = {}
+    for name, items in data.items():
+        fields = CUSTOM_CATALOGS.get(name)
+        if fields is None:
+            raise ValueError(f"{name}: not a custom catalog")
+        if not isinstance(items, list) or not items:
+            raise ValueError(f"{name}: expected a non-empty list")
+        if len(items) > MAX_ITEMS:
+            raise ValueError(f"{name}: more than {MAX_ITEMS} items")
+        unique = {}
+        for i, item in enumerate(items):
+            if len(fields) == 1:
+                row = (_field(item, f"{name}[{i}]"),)
+            elif isinstance(item, dict):
+                row = tuple(_field(item.get(field), f"{name}[{i}].{field}") for field in fields)
+            else:
+                raise ValueError(f"{name}[{i}]: expected an object with {', '.join(fields)}")
+            unique.setdefault(row, None)
+        rows[name] = list(unique)
+    return rows
+
+
+class CustomPacks:
+    """pack_id -> CustomPack for every pack some room still references."""
+
+    def __init__(self):
+        self._packs: "weakref.WeakValueDictionary[str, CustomPack]" = weakref.WeakValueDictionary()
+        self.created = 0
+        self.shared = 0
+
+    def load(self, data: Any) -> CustomPack:
+        """The shared pack for this content (validated, or built on first use)."""
+        if isinstance(data, CustomPack):
+            return data
+        rows = validate(data)
+        canonical = json.dumps(sorted(rows.items()), ensure_ascii=False).encode("utf-8")
+        pack_id = hashlib.blake2b(canonical, digest_size=8).hexdigest()
+        pack = self._packs.get(pack_id)
+        if pack is not None:
+            self.shared += 1
+            return pack
+        catalogs = {}
+        for name, items in rows.items():
+            fields = CUSTOM_CATALOGS[name]
+            if len(fields) == 1:
+                interned = [sys.intern(row[0]) for row in items]
+            else:
+                interned = [tuple(sys.intern(value) for value in row) for row in items]
+            catalogs[name] = Catalog.from_items(name, fields, interned)
+        pack = self._packs[pack_id] = CustomPack(pack_id, catalogs)
+        self.created += 1
+        return pack
+
+    def stats(self) -> dict:
+        return {"live": len(self._packs), "created": self.created, "shared": self.shared}
+
+
+# One registry per process, used by Room validation
+custom_packs = CustomPacks()
@@ -0,0 +1,208 @@
+"""
+Compiled content pack: every catalog (questions, topics, words) in one
+binary file, items addressed by integer id.
+
+Layout (little endian):
+
+    b"SGPK" | u16 format | u32 header length | header (JSON) | sections
+
+The header maps each catalog to its fields, item count and section, and
+records the pack id (a digest of the sections) and the source CSV stamps
+the pack was built from. A section holds, per field, (count + 1) u32
+offsets followed by the UTF-8 blob they index.
+Opening a pack reads the header only; a catalog's section is read the
+first time it is used, and each string is decoded once, on first access.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .sources import CONTENT_DIR, MODE_CATALOGS, SOURCES, read_source, source_stamps
+
+MAGIC = b"SGPK"
+FORMAT = 2
+_PREFIX = struct.Struct("<4sHI")
+
+DEFAULT_PACK_PATH = "data/content.pack"
+
+# A single-field item is its string, a multi-field one (word wolf pairs) a tuple
+Item = Union[str, Tuple[str, ...]]
+
+
+class Catalog:
+    """Items of one catalog by id (0 .. len - 1)."""
+
+    __slots__ = ("name", "fields", "_columns", "_items")
+
+    def __init__(self, name: str, fields: Tuple[str, ...], columns: List[Tuple[array, bytes]]):
+        self.name = name
+        self.fields = fields
+        self._columns = columns
+        self._items: List[Optional[Item]] = [None] * (len(columns[0][0]) - 1)
+
+    @classmethod
+    def from_items(cls, name: str, fields: Tuple[str, ...], items: List[Item]) -> 'Catalog':
+        """A catalog already decoded (custom packs)."""
+        catalog = cls.__new__(cls)
+        catalog.name = name
+        catalog.fields = fields
+        catalog._columns = None
+        catalog._items = list(items)
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, item_id: int) -> Item:
+        item = self._items[item_id]
+        if item is None:
+            # Interned: rooms' custom packs that repeat a stock item share the string
+            values = tuple(sys.intern(str(blob[offsets[item_id]:offsets[item_id + 1]], "utf-8"))
+                           for offsets, blob in self._columns)
+            item = self._items[item_id] = values[0] if len(values) == 1 else values
+        return item
+
+    def __iter__(self) -> Iterator[Item]:
+        return (self[i] for i in range(len(self)))
+
+
+def _encode_section(fields: Tuple[str, ...], rows: List[Tuple[str, ...]]) -> bytes:
+    parts = []
+    for column in range(len(fields)):
+        offsets = array("I", [0])
+        blob = bytearray()
+        for row in rows:
+            blob += row[column].encode("utf-8")
+            offsets.append(len(blob))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        parts.append(offsets.tobytes())
+        parts.append(bytes(blob))
+    return b"".join(parts)
+
+
+def compile_pack(source_dir: str = CONTENT_DIR) -> bytes:
+    """Parse every source CSV and encode them as one pack."""
+    stamps = source_stamps(source_dir)
+    catalogs = {}
+    sections = []
+    offset = 0
+    for name, source in SOURCES.items():
+        rows = read_source(name, source_dir)
+        section = _encode_section(source.fields, rows)
+        catalogs[name] = {"fields": list(source.fields), "count": len(rows), "offset": offset, "size": len(section)}
+        sections.append(section)
+        offset += len(section)
+    pack_id = hashlib.blake2b(b"".join(sections), digest_size=8).hexdigest()
+    header = json.dumps({"id": pack_id, "sources": stamps, "catalogs": catalogs}, ensure_ascii=False).encode("utf-8")
+    return _PREFIX.pack(MAGIC, FORMAT, len(header)) + header + b"".join(sections)
+
+
+class ContentPack:
+    def __init__(self, buffer, path: Optional[str] = None):
+        self.path = path
+        self._buffer = buffer
+        magic, version, header_len = _PREFIX.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT:
+            raise ValueError(f"not a content pack (format {FORMAT}): {path or 'buffer'}")
+        header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_len]))
+        # Same content, same id: rooms pin the pack their game started with by this id
+        self.pack_id: str = header["id"]
+        self.sources: Dict[str, Optional[list]] = header["sources"]
+        self._index: Dict[str, dict] = header["catalogs"]
+        self._base = _PREFIX.size + header_len
+        self._catalogs: Dict[str, Catalog] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'ContentPack':
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    def catalog(self, name: str) -> Catalog:
+        catalog = self._catalogs.get(name)
+        if catalog is None:
+            catalog = self._catalogs[name] = self._read_catalog(name)
+        return catalog
+
+    def _read_catalog(self, name: str) -> Catalog:
+        entry = self._index[name]
+        count = entry["count"]
+        position = self._base + entry["offset"]
+        columns = []
+        for _ in entry["fields"]:
+            offsets = array("I")
+            offsets.frombytes(self._buffer[position:position + (count + 1) * offsets.itemsize])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            position += len(offsets) * offsets.itemsize
+            blob = self._buffer[position:position + offsets[-1]]
+            position += offsets[-1]
+            columns.append((offsets, blob))
+        return Catalog(name, tuple(entry["fields"]), columns)
+
+    def load_mode(self, mode: str):
+        """Read the catalogs a game mode draws from (no-op once loaded)."""
+        for name in MODE_CATALOGS.get(mode, ()):
+            self.catalog(name)
+
+    def check(self):
+        """Refuse a pack with an empty catalog (nothing to draw mid-game)."""
+        empty = [name for name, entry in self._index.items() if entry["count"] == 0]
+        if empty:
+            raise ValueError(f"empty catalogs: {', '.join(empty)}")
+
+    def is_stale(self, source_dir: str = CONTENT_DIR) -> bool:
+        return self.sources != source_stamps(source_dir)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def stats(self) -> dict:
+        return {
+            "id": self.pack_id,
+            "path": self.path,
+            "items": {name: entry["count"] for name, entry in self._index.items()},
+            "loaded": sorted(self._catalogs),
+        }
+
+
+def write_pack(path: str, data: bytes):
+    """Replace the pack atomically (an open mmap of the old one stays valid)."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".content-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_pack(path: Optional[str] = DEFAULT_PACK_PATH, source_dir: str = CONTENT_DIR) -> ContentPack:
+    """
+    The compiled pack at path, rebuilt first if it is missing or older than
+    the CSVs. An empty path keeps the compiled pack in memory only.
+    """
+    if path:
+        try:
+            pack = ContentPack.open(path)
+            if not pack.is_stale(source_dir):
+                return pack
+            pack.close()
+        except (FileNotFoundError, ValueError, struct.error):
+            pass
+    data = compile_pack(source_dir)
+    if not path:
+        return ContentPack(data)
+    write_pack(path, data)
+    return ContentPack.open(path)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+from .pack import DEFAULT_PACK_PATH, ContentPack, compile_pack, write_pack
+from .sources import CONTENT_DIR, source_stamps
+
+if TYPE_CHECKING:
+    from game_engine import GameEngine
+
+# Seconds between checks of the CSV stamps (0 disables the watcher)
+WATCH_INTERVAL = 5.0
+
+
+class ContentReloader:
+    """
+    Rebuilds the content pack when the CSVs change (or on request) and swaps
+    it into the engine. Parsing, writing and reading the catalogs the old
+    pack had loaded all happen in a worker thread; the event loop only sees
+    the finished pack, installed by a single assignment. Games already
+    running keep drawing from the pack they started with.
+    """
+
+    def __init__(self, engine: 'GameEngine', path: Optional[str] = DEFAULT_PACK_PATH,
+                 source_dir: str = CONTENT_DIR, interval: float = WATCH_INTERVAL):
+        self.engine = engine
+        self.path = path
+        self.source_dir = source_dir
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        # Stamps of a failed build; not retried until the CSVs change again
+        self._failed: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _build(self, preload) -> ContentPack:
+        data = compile_pack(self.source_dir)
+        # Checked before it replaces the pack on disk (the next startup would load it)
+        ContentPack(data).check()
+        if self.path:
+            write_pack(self.path, data)
+            pack = ContentPack.open(self.path)
+        else:
+            pack = ContentPack(data, None)
+        for name in preload:
+            pack.catalog(name)
+        return pack
+
+    async def reload(self) -> ContentPack:
+        """Build and install a new pack; raises (keeping the current pack) if the CSVs are unusable."""
+        async with self._lock:
+            preload = self.engine.content.stats()["loaded"]
+            try:
+                pack = await asyncio.to_thread(self._build, preload)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            self.last_error = None
+            self.engine.swap_content(pack)
+            self.reloads += 1
+            return pack
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            stamps = await asyncio.to_thread(source_stamps, self.source_dir)
+            if stamps == self.engine.content.sources or stamps == self._failed:
+                continue
+            try:
+                pack = await self.reload()
+                print(f"📦 Reloaded content {pack.pack_id} ({', '.join(f'{k} {v}' for k, v in pack.stats()['items'].items())})")
+            except Exception as e:
+                self._failed = stamps
+                print(f"Content reload failed, keeping the current pack: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"reloads": self.reloads, "last_error": self.last_error, "interval": self.interval}
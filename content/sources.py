@@ -0,0 +1,65 @@
+import csv
+import os
+from typing import Dict, List, NamedTuple, Tuple
+
+# The CSVs live next to the code, wherever the process was started from
+CONTENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Source(NamedTuple):
+    file: str
+    fields: Tuple[str, ...]
+    # Used (with a warning) when the CSV is missing
+    defaults: List[Tuple[str, ...]]
+
+
+SOURCES: Dict[str, Source] = {
+    "questions": Source("questions.csv", ("question",), [
+        ("好きな食べ物は？",), ("無人島に持っていくなら？",), ("子供の頃の夢は？",),
+    ]),
+    "word_wolf_topics": Source("word_wolf_topics.csv", ("majority", "minority"), [
+        ("りんご", "なし"),
+    ]),
+    "sekai_questions": Source("sekai_questions.csv", ("question",), [
+        ("＿＿＿が足りないから今日は早く帰ります",), ("「＿＿＿」これが私の座右の銘です",),
+    ]),
+    "sekai_words": Source("sekai_words.csv", ("word",), [
+        ("愛",), ("お金",), ("時間",), ("友情",), ("睡眠",), ("カレー",), ("猫",), ("上司",),
+    ]),
+    "ito_topics": Source("ito_topics.csv", ("topic",), [
+        ("怖いもの",), ("かわいいもの",), ("おいしいもの",), ("高いもの",),
+    ]),
+}
+
+# Catalogs each game mode draws from (GameMode values)
+MODE_CATALOGS: Dict[str, Tuple[str, ...]] = {
+    "SYMPATHY": ("questions",),
+    "WORD_WOLF": ("word_wolf_topics",),
+    "SEKAI_NO_MIKATA": ("sekai_questions", "sekai_words"),
+    "ITO": ("ito_topics",),
+    "ONE_NIGHT_WEREWOLF": (),
+}
+
+
+def source_stamps(source_dir: str = CONTENT_DIR) -> Dict[str, list]:
+    """file -> [size, mtime_ns] (None if missing); a pack built from other stamps is stale."""
+    stamps = {}
+    for source in SOURCES.values():
+        try:
+            st = os.stat(os.path.join(source_dir, source.file))
+            stamps[source.file] = [st.st_size, st.st_mtime_ns]
+        except FileNotFoundError:
+            stamps[source.file] = None
+    return stamps
+
+
+def read_source(name: str, source_dir: str = CONTENT_DIR) -> List[Tuple[str, ...]]:
+    source = SOURCES[name]
+    try:
+        with open(os.path.join(source_dir, source.file), "r", encoding="utf-8") as f:
+            return [tuple(row[field] for field in source.fields) for row in csv.DictReader(f)]
+    except KeyError as e:
+        raise ValueError(f"{source.file}: missing column {e}") from None
+    except FileNotFoundError:
+        print(f"Warning: {source.file} not found. Using defaults.")
+        return list(source.defaults)
@@ -1,3 +1,4 @@
-from .base import GameEngine
+from .base import API_CLIENT_ID, GameEngine
+from .events import RoomEvent
 
-__all__ = ['GameEngine']
+__all__ = ['API_CLIENT_ID', 'GameEngine', 'RoomEvent']
@@ -1,7 +1,10 @@
-import csv
-from typing import TYPE_CHECKING
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
-from models import Room, Phase, GameMode
+from content import Catalog, ContentPack, Item, custom_packs, load_pack
+from models import Room, Phase, GameMode, rooms
+from .events import RoomEvent
 
 if TYPE_CHECKING:
     from .sympathy import SympathyGame
@@ -10,15 +13,18 @@ if TYPE_CHECKING:
     from .ito import ItoGame
     from .werewolf import WerewolfGame
 
+# HTTP API から送るメッセージの送信者 (ソケットのクライアントIDには使えない)
+API_CLIENT_ID = "API"
+
 
 class GameEngine:
-    def __init__(self):
-        self.questions: list[str] = []
-        self.word_wolf_topics: list[dict] = []
-        self.sekai_questions: list[str] = []
-        self.sekai_words: list[str] = []
-        self.ito_topics: list[str] = []
-        self.load_data()
+    def __init__(self, content: Optional[ContentPack] = None):
+        # お題・単語のパック (省略時は data/content.pack、CSVより古ければ作り直す)
+        self.content = content if content is not None else load_pack()
+        # pack_id -> パック。差し替え後も、古いパックで始まったゲームがある間は残す
+        self.packs: Dict[str, ContentPack] = {self.content.pack_id: self.content}
+        # 受理されたメッセージごとに RoomEvent で呼ばれる (イベントログ用)
+        self.on_event: List[Callable[[RoomEvent], None]] = []
 
         # 各ゲームモジュールを初期化
         from .sympathy import SympathyGame
@@ -33,64 +39,73 @@ class GameEngine:
         self.ito = ItoGame(self)
         self.werewolf = WerewolfGame(self)
 
-    def load_data(self):
-        # Load Questions
-        try:
-            with open("questions.csv", "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.questions = [row["question"] for row in reader]
-        except FileNotFoundError:
-            print("Warning: questions.csv not found. Using default questions.")
-            self.questions = ["好きな食べ物は？", "無人島に持っていくなら？", "子供の頃の夢は？"]
-
-        # Load Word Wolf Topics
-        try:
-            with open("word_wolf_topics.csv", "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.word_wolf_topics = [{"majority": row["majority"], "minority": row["minority"]} for row in reader]
-        except FileNotFoundError:
-            print("Warning: word_wolf_topics.csv not found.")
-            self.word_wolf_topics = [{"majority": "りんご", "minority": "なし"}]
-
-        # Load Sekai No Mikata Questions
-        try:
-            with open("sekai_questions.csv", "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.sekai_questions = [row["question"] for row in reader]
-        except FileNotFoundError:
-            print("Warning: sekai_questions.csv not found. Using defaults.")
-            self.sekai_questions = [
-                "＿＿＿が足りないから今日は早く帰ります",
-                "「＿＿＿」これが私の座右の銘です",
-            ]
-
-        # Load Sekai No Mikata Words
-        try:
-            with open("sekai_words.csv", "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.sekai_words = [row["word"] for row in reader]
-        except FileNotFoundError:
-            print("Warning: sekai_words.csv not found. Using defaults.")
-            self.sekai_words = [
-                "愛", "お金", "時間", "友情", "睡眠", "カレー", "猫", "上司",
-            ]
-
-        # Load ito Topics
-        try:
-            with open("ito_topics.csv", "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.ito_topics = [row["topic"] for row in reader]
-        except FileNotFoundError:
-            print("Warning: ito_topics.csv not found. Using defaults.")
-            self.ito_topics = [
-                "怖いもの", "かわいいもの", "おいしいもの", "高いもの",
-            ]
-
-    def process_message(self, room: Room, client_id: str, msg_type: str, payload: dict) -> bool:
+    def swap_content(self, pack: ContentPack):
+        """新しいパックに切り替える (代入1回)。進行中のゲームは開始時のパックを使い続ける"""
+        self.packs[pack.pack_id] = pack
+        self.content = pack
+        self.release_content()
+
+    def release_content(self, room_id: Optional[str] = None):
+        """どのルームも使っていない古いパックを手放す (lifecycle.on_evict 用)"""
+        if len(self.packs) <= 1:
+            return
+        in_use = {self.content.pack_id}
+        in_use.update(room.content_id for room in rooms.values())
+        for pack_id in list(self.packs):
+            if pack_id not in in_use:
+                del self.packs[pack_id]
+
+    def catalog(self, room: Room, name: str) -> Catalog:
+        """
+        ルームのゲームが使うカタログ。ルーム独自のパックにあればそれ、
+        無ければ開始時のパック (再起動などで無ければ現在のパック)
+        """
+        if room.custom_pack is not None:
+            custom = room.custom_pack.catalog(name)
+            if custom is not None:
+                return custom
+        return self.packs.get(room.content_id, self.content).catalog(name)
+
+    def draw(self, room: Room, catalog: str) -> Item:
+        """カタログから1項目 (ルームの山札から。一巡するまで重複なし)"""
+        items = self.catalog(room, catalog)
+        return items[room.draw(catalog, len(items))]
+
+    def deal(self, room: Room, catalog: str, count: int) -> List[Item]:
+        """count 枚の手札 (ルームの山札から。一巡するまで配った札・手札内で重複なし)"""
+        items = self.catalog(room, catalog)
+        deck = room.deck(catalog, len(items))
+        count = min(count, len(items))
+        if deck.remaining < count:
+            # 手札の途中で切り直すと同じ札が2枚入りうるので先に切り直す
+            deck.reset()
+        return [items[deck.draw(room.rng)] for _ in range(count)]
+
+    def process_message(self, room: Room, client_id: str, msg_type: str, payload: dict,
+                        seed: Optional[int] = None, now: Optional[float] = None) -> bool:
         """
         Process the message and update room state.
         Returns True if state should be broadcasted.
+        seed/now are given only when replaying an event log.
         """
+        # 乱数・時刻はメッセージ単位で固定し、イベントとして記録する
+        if seed is None:
+            seed = random.getrandbits(63)
+        if now is None:
+            now = time.time()
+        room.begin_message(seed, now)
+        changed = self._dispatch(room, client_id, msg_type, payload)
+        if changed:
+            # ビューのキャッシュを無効化
+            room.version += 1
+            if self.on_event:
+                content_id = room.content_id if msg_type == "START_GAME" else None
+                event = RoomEvent(room.room_id, room.version, now, seed, client_id, msg_type, payload, content_id)
+                for listener in self.on_event:
+                    listener(event)
+        return changed
+
+    def _dispatch(self, room: Room, client_id: str, msg_type: str, payload: dict) -> bool:
         # 共通メッセージ処理
         if msg_type == "JOIN":
             name = payload.get("name", "Unknown")
@@ -102,6 +117,22 @@ class GameEngine:
             self.start_game(room, mode_str)
             return True
 
+        if msg_type == "SET_CUSTOM_CONTENT":
+            # 会場独自のお題 (HTTP API からのみ、ロビーでのみ。空なら標準に戻す)
+            # ソケットから来たものはサイズ上限・検証を通っていないので受け付けない
+            if client_id != API_CLIENT_ID or room.phase != Phase.LOBBY:
+                return False
+            try:
+                pack = custom_packs.load(payload) if payload else None
+            except ValueError as e:
+                print(f"Rejected custom content for {room.room_id}: {e}")
+                return False
+            # 同じ内容のパックは同じインスタンス。変化がなければ版も上げず配信もしない
+            if pack is room.custom_pack:
+                return False
+            room.custom_pack = pack
+            return True
+
         if msg_type == "UPDATE_CONFIG":
             self.update_config(room, payload)
             return True
@@ -127,6 +158,9 @@ class GameEngine:
 
     def start_game(self, room: Room, mode_str: str):
         room.mode = GameMode(mode_str)
+        # このゲームの間は今のパックから引く (途中でリロードされても山札とお題が食い違わない)
+        room.content_id = self.content.pack_id
+        self.content.load_mode(room.mode.value)
         if room.mode == GameMode.SYMPATHY:
             room.phase = Phase.INSTRUCTION
             room.reset_round()
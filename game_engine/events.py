@@ -0,0 +1,17 @@
+from typing import NamedTuple, Optional
+
+
+class RoomEvent(NamedTuple):
+    """
+    受理された1メッセージ。seed と at (時刻) があれば同じ状態を再現できる。
+    version は適用後の Room.version (ルームが作り直されると 1 から)。
+    content_id はゲーム開始 (START_GAME) で固定したパックの id。再生時にパックの取り違えを検出する。
+    """
+    room_id: str
+    version: int
+    at: float
+    seed: int
+    client_id: str
+    msg_type: str
+    payload: Optional[dict]
+    content_id: Optional[str] = None
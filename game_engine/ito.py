@@ -1,4 +1,3 @@
-import random
 from typing import TYPE_CHECKING
 
 from models import Room, Phase, ItoState, ItoPlayedCard
@@ -38,21 +37,16 @@ class ItoGame:
             return
 
         # お題を選択
-        available_topics = [t for t in self.engine.ito_topics if t not in (room.ito_state.used_topics if room.ito_state else [])]
-        if not available_topics:
-            available_topics = self.engine.ito_topics.copy()
-
-        topic = random.choice(available_topics)
+        topic = self.engine.draw(room, "ito_topics")
 
         # 各プレイヤーに1〜100の数字をランダム配布（重複なし）
-        numbers = random.sample(range(1, 101), len(player_ids))
+        numbers = room.rng.sample(range(1, 101), len(player_ids))
         player_numbers = {pid: num for pid, num in zip(player_ids, numbers)}
 
         room.ito_state = ItoState(
             is_coop_mode=room.config_ito_coop,
             close_call_enabled=room.config_ito_close_call,
             current_topic=topic,
-            used_topics=[topic],
             player_numbers=player_numbers,
             played_cards=[],
             last_played_number=0,
@@ -182,18 +176,11 @@ class ItoGame:
                 return
 
         # お題を選択（新しいお題）
-        available_topics = [t for t in self.engine.ito_topics if t not in state.used_topics]
-        if not available_topics:
-            state.used_topics = []
-            available_topics = self.engine.ito_topics.copy()
-
-        topic = random.choice(available_topics)
-        state.used_topics.append(topic)
-        state.current_topic = topic
+        state.current_topic = self.engine.draw(room, "ito_topics")
 
         # 新しい数字を配布
         player_ids = list(room.players.keys())
-        numbers = random.sample(range(1, 101), len(player_ids))
+        numbers = room.rng.sample(range(1, 101), len(player_ids))
         state.player_numbers = {pid: num for pid, num in zip(player_ids, numbers)}
 
         # 状態をリセット
@@ -0,0 +1,29 @@
+"""
+Sympathy の回答の表記ゆれ吸収 (同じ答えを同じグループに入れるためのキー)
+
+    NFKC (全角英数→半角、半角カナ→全角) → 小文字化 → カタカナ→ひらがな
+    → 長音・句読点・記号・空白を除去
+
+例: 「ラーメン！」「ﾗｰﾒﾝ」「らーめん」→「らめん」、「ＣＯＦＦＥＥ」「coffee.」→「coffee」
+"""
+import unicodedata
+from functools import lru_cache
+
+# カタカナ (ァ..ヶ) → ひらがな (ぁ..ゖ)
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+# 長音記号 (NFKC 後は半角の ｰ も ー になる)
+_LONG_VOWEL = "ー"
+
+
+def _keep(ch: str) -> bool:
+    # P: 句読点・括弧・ダッシュ (〜 を含む), S: 記号, Z: 空白
+    return ch != _LONG_VOWEL and unicodedata.category(ch)[0] not in "PSZ" and not ch.isspace()
+
+
+@lru_cache(maxsize=8192)
+def normalize_answer(text: str) -> str:
+    """グループ分けのキー。同じ回答文字列はメモ化した結果を返す"""
+    folded = unicodedata.normalize("NFKC", text).casefold().translate(_KATAKANA_TO_HIRAGANA)
+    stripped = "".join(ch for ch in folded if _keep(ch))
+    # 記号だけの回答 (絵文字など) は記号のまま比べる
+    return stripped or folded.strip()
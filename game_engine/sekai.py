@@ -1,5 +1,3 @@
-import random
-import uuid
 from typing import TYPE_CHECKING
 
 from models import Room, Phase, SekaiNoMikataState, SekaiAnswer
@@ -43,7 +41,7 @@ class SekaiGame:
 
         # 親の順番をシャッフル
         reader_order = player_ids.copy()
-        random.shuffle(reader_order)
+        room.rng.shuffle(reader_order)
 
         room.sekai_state = SekaiNoMikataState(
             reader_order=reader_order,
@@ -67,46 +65,17 @@ class SekaiGame:
         state.current_reader_id = state.reader_order[state.current_reader_index]
 
         # お題を選択（使用済みを避ける）
-        available_questions = [q for q in self.engine.sekai_questions if q not in state.used_questions]
-        if not available_questions:
-            state.used_questions = []
-            available_questions = self.engine.sekai_questions
+        state.current_question = self.engine.draw(room, "sekai_questions")
 
-        state.current_question = random.choice(available_questions)
-        state.used_questions.append(state.current_question)
+        # 各プレイヤー（親以外）に8枚ずつ配布。同じ山札から順に配るので手札同士で重複しない
+        hands = [pid for pid in room.players.keys() if pid != state.current_reader_id]
 
-        # 各プレイヤー（親以外）に単語の選択肢を配布（偏り防止）
-        state.word_choices = {}
+        # 単語の山札は残り50枚未満（またはこのラウンドの配布分未満）になったら切り直す（偏り防止）
+        deck = room.deck("sekai_words", len(self.engine.catalog(room, "sekai_words")))
+        if deck.remaining < max(50, 8 * len(hands)):
+            deck.reset()
 
-        # 使用可能な単語を取得（使用済みを避ける）
-        available_words = [w for w in self.engine.sekai_words if w not in state.used_words]
-
-        # 使用済みが多すぎたらリセット（残り50個未満で）
-        if len(available_words) < 50:
-            state.used_words = []
-            available_words = self.engine.sekai_words.copy()
-
-        # このラウンドで配布する単語を管理
-        round_used_words = []
-
-        for pid in room.players.keys():
-            if pid != state.current_reader_id:
-                # まだこのラウンドで使われていない単語から選択
-                pool = [w for w in available_words if w not in round_used_words]
-
-                # プールが足りなければリセット
-                if len(pool) < 8:
-                    pool = available_words.copy()
-
-                # 8個の単語をランダムに選択
-                choices = random.sample(pool, min(8, len(pool)))
-                state.word_choices[pid] = choices
-
-                # このラウンドで使用済みにする
-                round_used_words.extend(choices)
-
-        # 使用済み単語を記録
-        state.used_words.extend(round_used_words)
+        state.word_choices = {pid: self.engine.deal(room, "sekai_words", 8) for pid in hands}
 
         # 回答をリセット
         state.submitted_answers = {}
@@ -139,7 +108,7 @@ class SekaiGame:
             return False  # 既に回答済み
 
         # 回答を作成
-        ans_id = str(uuid.uuid4())
+        ans_id = room.new_id()
         answer = SekaiAnswer(
             answer_id=ans_id,
             player_id=client_id,
@@ -169,10 +138,10 @@ class SekaiGame:
 
         # ダミー回答を追加（山札から2枚、4人以上は1枚）
         num_dummies = 2 if len(room.players) <= 3 else 1
-        dummy_words = random.sample(self.engine.sekai_words, min(num_dummies, len(self.engine.sekai_words)))
+        dummy_words = self.engine.deal(room, "sekai_words", num_dummies)
 
         for word in dummy_words:
-            ans_id = str(uuid.uuid4())
+            ans_id = room.new_id()
             dummy = SekaiAnswer(
                 answer_id=ans_id,
                 player_id="DUMMY",
@@ -184,7 +153,7 @@ class SekaiGame:
 
         # 全回答をまとめてシャッフル
         all_answers = list(state.submitted_answers.values()) + state.dummy_answers
-        random.shuffle(all_answers)
+        room.rng.shuffle(all_answers)
         state.all_answers_for_display = all_answers
 
         room.phase = Phase.JUDGING
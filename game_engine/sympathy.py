@@ -1,9 +1,7 @@
-import random
-import time
-import uuid
 from typing import TYPE_CHECKING
 
 from models import Room, Phase, GameMode, Answer
+from .normalize import normalize_answer
 
 if TYPE_CHECKING:
     from .base import GameEngine
@@ -61,15 +59,17 @@ class SympathyGame:
             room.shuffle_triggered_in_round = True
             did_use_shuffle = True
 
-        ans_id = str(uuid.uuid4())
+        ans_id = room.new_id()
+        normalized = normalize_answer(text)
         room.answers[ans_id] = Answer(
             answer_id=ans_id,
             player_id=client_id,
             player_name=player.name,
             raw_text=text,
-            normalized_text=text.strip(),
-            group_id=ans_id,
-            timestamp=time.time(),
+            normalized_text=normalized,
+            # 届いた時点でグループ分け (同じキーの最初の回答のグループに入る)
+            group_id=room.answer_groups.setdefault(normalized, ans_id),
+            timestamp=room.now(),
             used_shuffle=did_use_shuffle
         )
         return True
@@ -78,23 +78,19 @@ class SympathyGame:
         # SHUFFLE LOGIC
         if room.shuffle_triggered_in_round:
             all_texts = [a.raw_text for a in room.answers.values()]
-            random.shuffle(all_texts)
+            room.rng.shuffle(all_texts)
             sub_keys = list(room.answers.keys())
             for i, key in enumerate(sub_keys):
                 if i < len(all_texts):
                     room.answers[key].raw_text = all_texts[i]
-                    room.answers[key].normalized_text = all_texts[i].strip()
-
-        # AUTO-GROUPING
-        text_to_group_id = {}
-        for ans_id, answer in room.answers.items():
-            norm_text = answer.normalized_text.lower()
-            if norm_text in text_to_group_id:
-                answer.group_id = text_to_group_id[norm_text]
-            else:
-                text_to_group_id[norm_text] = ans_id
-                answer.group_id = ans_id
+                    room.answers[key].normalized_text = normalize_answer(all_texts[i])
 
+            # 回答が入れ替わったのでグループを作り直す (正規化はメモ化済み)
+            room.answer_groups = {}
+            for ans_id, answer in room.answers.items():
+                answer.group_id = room.answer_groups.setdefault(answer.normalized_text, ans_id)
+
+        # それ以外はグループ分け済み (submit_answer)
         room.phase = Phase.JUDGING
 
     def finish_judging(self, room: Room):
@@ -107,14 +103,6 @@ class SympathyGame:
     def next_round(self, room: Room):
         room.reset_round()
 
-        available_questions = [q for q in self.engine.questions if q not in room.used_questions]
-
-        if not available_questions:
-            room.used_questions = set()
-            available_questions = self.engine.questions
-
-        new_q = random.choice(available_questions)
-        room.current_question = new_q
-        room.used_questions.add(new_q)
+        room.current_question = self.engine.draw(room, "questions")
 
         room.phase = Phase.ANSWERING
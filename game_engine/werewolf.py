@@ -1,5 +1,3 @@
-import random
-import time
 from typing import Dict, List, TYPE_CHECKING
 
 from models import Room, Phase, WerewolfState, WerewolfRole, WerewolfNightPhase
@@ -65,7 +63,7 @@ class WerewolfGame:
             cards.append(WerewolfRole.VILLAGER)
 
         # シャッフルして配布
-        random.shuffle(cards)
+        room.rng.shuffle(cards)
 
         # プレイヤーに配布
         original_roles: Dict[str, WerewolfRole] = {}
@@ -235,7 +233,7 @@ class WerewolfGame:
 
         state = room.werewolf_state
         state.night_phase = WerewolfNightPhase.DONE
-        state.discussion_end_time = time.time() + room.config_discussion_time
+        state.discussion_end_time = room.now() + room.config_discussion_time
 
         # プレイヤーの投票状態をリセット
         for p in room.players.values():
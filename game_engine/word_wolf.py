@@ -1,5 +1,3 @@
-import random
-import time
 from typing import TYPE_CHECKING
 
 from models import Room, Phase, WordWolfState
@@ -42,10 +40,8 @@ class WordWolfGame:
         majority_topic = "Topic A"
         minority_topic = "Topic B"
         try:
-            if self.engine.word_wolf_topics:
-                topic_pair = random.choice(self.engine.word_wolf_topics)
-                majority_topic = topic_pair.get("majority", "A")
-                minority_topic = topic_pair.get("minority", "B")
+            if len(self.engine.catalog(room, "word_wolf_topics")):
+                majority_topic, minority_topic = self.engine.draw(room, "word_wolf_topics")
         except Exception as e:
             print(f"Topic error: {e}")
 
@@ -55,14 +51,14 @@ class WordWolfGame:
         if player_ids:
             try:
                 # 1 Wolf
-                wolf_ids = random.sample(player_ids, 1)
+                wolf_ids = room.rng.sample(player_ids, 1)
             except ValueError:
                 wolf_ids = [player_ids[0]]
 
         room.word_wolf_state = WordWolfState(
             wolf_ids=wolf_ids,
             topics={},
-            discussion_end_time=time.time() + room.config_discussion_time,
+            discussion_end_time=room.now() + room.config_discussion_time,
             votes={}
         )
 
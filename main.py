@@ -1,20 +1,38 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from typing import List, Dict
+from typing import Optional
+import asyncio
 import json
+import os
+import secrets
+import signal
 import uuid
 
-from models import Room, Player, Phase, get_or_create_room, rooms, GameMode, WordWolfState
+from models import Room, Player, Phase, rooms, GameMode, WordWolfState
+from realtime import ConnectionManager, RoomActors
+from store import RoomLifecycle, SnapshotStore, Hibernator, Handoff, create_room_store
+from store.event_log import EventLog
+from sharding import current_shard, owns_room
 
 app = FastAPI()
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-from game_engine import GameEngine
-engine = GameEngine()
+from content import custom_packs, load_pack
+from content.custom import MAX_UPLOAD_BYTES
+from content.reload import ContentReloader
+from game_engine import API_CLIENT_ID, GameEngine
+# Questions/topics/words compiled into one pack (python -m content); rebuilt on startup
+# when the CSVs are newer, empty CONTENT_PACK_PATH keeps it in memory only
+content_pack_path = os.environ.get("CONTENT_PACK_PATH", "data/content.pack")
+engine = GameEngine(load_pack(content_pack_path))
+# Edited CSVs are picked up without a restart (checked every CONTENT_WATCH_INTERVAL
+# seconds, 0 turns the watcher off; POST /admin/content/reload forces it)
+content_reloader = ContentReloader(engine, content_pack_path,
+                                   interval=float(os.environ.get("CONTENT_WATCH_INTERVAL", "5")))
 
 
 def get_local_ip():
@@ -36,65 +54,129 @@ async def startup_event():
     print(f"🏠 Local: http://127.0.0.1:8000/host/<RoomID>")
     print(f"🌐 Network (For Smartphones): http://{ip}:8000/host/<RoomID>")
     print(f"{'='*40}\n")
+    if snapshots:
+        restored = await snapshots.restore()
+        print(f"♻️  Restored {restored} rooms from {snapshots.path}")
+    if handoff is not None:
+        # After the snapshots: a handed-off room is never older than its snapshot
+        adopted = await handoff.restore(rooms)
+        if adopted:
+            print(f"📦 Adopted {adopted} rooms from {handoff.path}")
+    if handoff is not None:
+        # Rooms handed off after this process started (it usually starts before the old one drains)
+        handoff.start(rooms)
+    if snapshots:
+        snapshots.start()
+    if event_log:
+        event_log.start()
+    if hibernator is not None:
+        await hibernator.start()
+    lifecycle.start()
+    content_reloader.start()
+    await room_store.start(on_remote_update)
+    # uvicorn closes every socket before the shutdown hook runs, so the drain
+    # has to run from SIGTERM itself; uvicorn's own handler follows it
+    previous = signal.getsignal(signal.SIGTERM)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(drain_then_exit(previous)))
+    except (NotImplementedError, RuntimeError):
+        pass  # Windows, or not the main thread
 
-class ConnectionManager:
-    def __init__(self):
-        # active_connections: room_id -> list of WebSockets
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        # socket_map: WebSocket -> client_id
-        self.socket_map: Dict[WebSocket, str] = {}
-
-    async def connect(self, room_id: str, client_id: str, websocket: WebSocket):
-        await websocket.accept()
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(websocket)
-        self.socket_map[websocket] = client_id
-
-    def disconnect(self, websocket: WebSocket, room_id: str):
-        if room_id in self.active_connections:
-            if websocket in self.active_connections[room_id]:
-                self.active_connections[room_id].remove(websocket)
-        if websocket in self.socket_map:
-            del self.socket_map[websocket]
-
-    def get_room(self, room_id: str):
-        return get_or_create_room(room_id)
-
-    async def send_personal_message(self, websocket: WebSocket, message: dict):
-        try:
-             json_msg = json.dumps(message, default=str)
-             await websocket.send_text(json_msg)
-        except Exception:
-            pass
-
-    async def broadcast_state(self, room_id: str):
-        if room_id in self.active_connections:
-            room = get_or_create_room(room_id)
-            
-            # Broadcast loop with per-player filtering
-            active = self.active_connections[room_id][:]
-            for connection in active:
-                client_id = self.socket_map.get(connection)
-                if not client_id:
-                    continue
-                
-                # Create sanitized view for this player
-                view_data = room.get_view(client_id)
-                
-                message = {
-                    "type": "STATE_UPDATE",
-                    "data": view_data
-                }
-                
-                try:
-                    await connection.send_text(json.dumps(message, default=str))
-                except Exception:
-                    # Clean up broken connections?
-                    # self.disconnect(connection, room_id)
-                    pass
+@app.on_event("shutdown")
+async def shutdown_event():
+    await content_reloader.close()
+    if snapshots:
+        await snapshots.close()
+    if event_log:
+        await event_log.close()
+    if hibernator is not None:
+        await hibernator.close()
+    if handoff is not None:
+        handoff.close()
+    await room_store.close()
 
 manager = ConnectionManager()
+# Set ROOM_STORE_URL (e.g. redis://localhost:6379/0) to share rooms between workers
+room_store_url = os.environ.get("ROOM_STORE_URL")
+# Idle rooms between games are paged out to disk (empty HIBERNATE_PATH turns it off);
+# with a shared store the shared copy already outlives this process
+hibernate_path = os.environ.get("HIBERNATE_PATH", "data/hibernated.sqlite3")
+hibernator = Hibernator(hibernate_path) if hibernate_path and not room_store_url else None
+room_store = create_room_store(room_store_url, hibernator)
+actors = RoomActors(engine, manager, room_store)
+lifecycle = RoomLifecycle(rooms, manager.connection_count, hibernator=hibernator)
+lifecycle.on_evict.append(actors.release)
+lifecycle.on_evict.append(manager.forget_room)
+lifecycle.on_evict.append(engine.release_content)
+
+# Crash-safe room snapshots; set SNAPSHOT_PATH to an empty string to turn them off
+snapshot_path = os.environ.get("SNAPSHOT_PATH", "data/rooms.sqlite3")
+snapshots = SnapshotStore(snapshot_path, rooms) if snapshot_path else None
+if snapshots:
+    actors.on_phase_change.append(snapshots.request_flush)
+    lifecycle.on_evict.append(snapshots.forget)
+
+# Replayable log of every accepted message (python -m store.event_log); empty EVENT_LOG_PATH turns it off
+event_log_path = os.environ.get("EVENT_LOG_PATH", "data/events.sqlite3")
+event_log = EventLog(event_log_path) if event_log_path else None
+if event_log:
+    engine.on_event.append(event_log.record)
+
+# Deploy drain (SIGTERM or POST /admin/drain) hands every room and its resume tokens
+# to the next process through HANDOFF_PATH, which therefore has to be on a disk both
+# processes see; empty turns it off. A shared store (ROOM_STORE_URL) needs no handoff.
+handoff_path = os.environ.get("HANDOFF_PATH", "data/handoff.sqlite3")
+handoff = Handoff(handoff_path) if handoff_path and not room_store_url else None
+if handoff is not None:
+    handoff.on_adopt.append(manager.adopt_sessions)
+# POST /admin/* requires X-Admin-Token to match; unset disables those endpoints
+admin_token = os.environ.get("ADMIN_TOKEN")
+_drain_task: Optional[asyncio.Task] = None
+
+def draining() -> bool:
+    return _drain_task is not None
+
+async def _drain():
+    # Finish every queued message first so the handoff holds the final state
+    await actors.stop_all()
+    if handoff is not None:
+        saved = await handoff.save(list(rooms.values()), manager.sessions)
+        print(f"📦 Handed off {saved} rooms to {handoff.path}")
+    await manager.send_reconnect()
+
+def drain() -> asyncio.Task:
+    """Stop taking messages, hand the rooms off, then send every client to the next process."""
+    global _drain_task
+    if _drain_task is None:
+        _drain_task = asyncio.ensure_future(_drain())
+    return _drain_task
+
+async def drain_then_exit(previous):
+    try:
+        await drain()
+    except Exception as e:
+        print(f"Drain failed: {e}")
+    # Hand SIGTERM back to whoever had it (uvicorn) and deliver it again
+    asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+    signal.signal(signal.SIGTERM, previous)
+    signal.raise_signal(signal.SIGTERM)
+
+async def enter_room(room_id: str):
+    """
+    Before a client is let into a room: adopt it if a draining process just
+    handed it off, page it in if hibernated, and mark it active so a sweep
+    cannot hibernate it during the handshake.
+    """
+    if handoff is not None:
+        await handoff.adopt(room_id, rooms)
+    await room_store.load(room_id)
+    lifecycle.touch(room_id)
+
+async def on_remote_update(room_id: str):
+    # Another worker changed a room we hold sockets for
+    if manager.connection_count(room_id):
+        await manager.broadcast_state(room_id)
 
 @app.get("/", response_class=HTMLResponse)
 async def get_landing(request: Request):
@@ -102,6 +184,10 @@ async def get_landing(request: Request):
 
 @app.get("/host/{room_id}", response_class=HTMLResponse)
 async def get_host(request: Request, room_id: str):
+    if not owns_room(room_id):
+        raise HTTPException(status_code=404)
+    # Page a hibernated room back in before its sockets arrive
+    await enter_room(room_id)
     network_ip = get_local_ip()
     return templates.TemplateResponse("host.html", {
         "request": request,
@@ -111,42 +197,148 @@ async def get_host(request: Request, room_id: str):
 
 @app.get("/play/{room_id}", response_class=HTMLResponse)
 async def get_player(request: Request, room_id: str):
+    if not owns_room(room_id):
+        raise HTTPException(status_code=404)
+    await enter_room(room_id)
     return templates.TemplateResponse("player.html", {"request": request, "room_id": room_id})
 
+@app.get("/stats")
+async def get_stats():
+    shard_index, shard_count = current_shard()
+    return {"shard": {"index": shard_index, "count": shard_count},
+            "rooms": lifecycle.stats(), "connections": manager.stats(), "store": room_store.stats(),
+            "snapshots": snapshots.stats() if snapshots else None,
+            "event_log": event_log.stats() if event_log else None,
+            "content": {**engine.content.stats(), "packs": len(engine.packs), **content_reloader.stats(),
+                        "custom": custom_packs.stats()},
+            "handoff": handoff.stats() if handoff is not None else None,
+            "draining": draining()}
+
+async def read_body(request: Request, limit: int) -> bytes:
+    """The request body, refused with 413 as soon as it is known to exceed limit bytes."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413)
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413)
+    return bytes(body)
+
+def in_lobby(room: Room):
+    if room.phase != Phase.LOBBY:
+        raise HTTPException(status_code=409, detail="custom content can only be changed in the lobby")
+
+async def set_room_content(room_id: str, payload: dict) -> bool:
+    """Replace the room's custom content (in the lobby only); False if it already had this content."""
+    if draining():
+        # The rooms are being (or have been) handed off; the next process takes it
+        raise HTTPException(status_code=503)
+    # Through the room's actor like a socket message: ordered with them,
+    # versioned, in the event log and broadcast
+    lifecycle.touch(room_id)
+    try:
+        return await actors.get(room_id).call(API_CLIENT_ID, "SET_CUSTOM_CONTENT", payload, check=in_lobby)
+    finally:
+        actors.release(room_id)
+
+@app.put("/rooms/{room_id}/content")
+async def put_room_content(request: Request, room_id: str):
+    """
+    Attach the venue's own content to a room:
+    {"questions": ["..."], "word_wolf_topics": [{"majority": "...", "minority": "..."}]}
+    """
+    if not owns_room(room_id):
+        raise HTTPException(status_code=404)
+    body = await read_body(request, MAX_UPLOAD_BYTES)
+    try:
+        pack = custom_packs.load(json.loads(body))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    await set_room_content(room_id, pack.dump())
+    return {"pack_id": pack.pack_id, "items": {name: len(catalog) for name, catalog in pack.catalogs.items()}}
+
+@app.delete("/rooms/{room_id}/content")
+async def delete_room_content(room_id: str):
+    if not owns_room(room_id):
+        raise HTTPException(status_code=404)
+    removed = await set_room_content(room_id, {})
+    # Removing content a room does not have is a no-op, not an error
+    return {"pack_id": None, "removed": removed}
+
+def require_admin(request: Request):
+    token = request.headers.get("x-admin-token", "")
+    if not admin_token or not secrets.compare_digest(token, admin_token):
+        raise HTTPException(status_code=403)
+
+@app.post("/admin/content/reload")
+async def post_content_reload(request: Request):
+    require_admin(request)
+    try:
+        pack = await content_reloader.reload()
+    except Exception as e:
+        # The current pack stays in place
+        raise HTTPException(status_code=422, detail=str(e))
+    return pack.stats()
+
+@app.post("/admin/drain")
+async def post_drain(request: Request):
+    require_admin(request)
+    await drain()
+    # Exit once this response is out (same path as a SIGTERM from the platform)
+    asyncio.get_running_loop().call_later(0.1, signal.raise_signal, signal.SIGTERM)
+    return {"handoff": handoff.stats() if handoff is not None else None}
+
 
 
 
 
 @app.websocket("/ws/{room_id}/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: str, client_id: str):
+    if not owns_room(room_id):
+        # Another shard owns this room (python -m sharding); never hold a copy here
+        await websocket.close(code=1008)
+        return
+    if draining():
+        # 1012 Service Restart: the client retries and lands on the next process
+        await websocket.close(code=1012)
+        return
+    if client_id == API_CLIENT_ID:
+        # Reserved for messages from the HTTP API
+        await websocket.close(code=1008)
+        return
+    await enter_room(room_id)
+    # Queues this socket's first state only (or just the updates it missed)
     await manager.connect(room_id, client_id, websocket)
-    room = manager.get_room(room_id)
-    
-    # Broadcast initial state to the new connector
-    await manager.broadcast_state(room_id)
+    actor = actors.get(room_id)
 
     try:
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
+            manager.touch(websocket)
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
             msg_type = message.get("type")
             payload = message.get("data", {})
+            if not isinstance(payload, dict):
+                continue
 
-            # --- Message Handling Logic ---
-            
-            # Special Handling for PEEK which is personal
-            if msg_type == "WEREWOLF_PEEK":
-                target = payload.get("target")
-                result = room.handle_seer_peek(client_id, target)
-                await manager.send_personal_message(websocket, {
-                    "type": "WEREWOLF_PEEK_RESULT",
-                    "data": {"result": result, "target": target}
-                })
+            if msg_type == "PONG" or draining():
                 continue
 
-            if engine.process_message(room, client_id, msg_type, payload):
-                await manager.broadcast_state(room_id)
-                
+            # Applied in order by the room's actor
+            lifecycle.touch(room_id)
+            actor.post(client_id, websocket, msg_type, payload)
+
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Whatever ended the loop, the socket must not keep the actor or the room alive
         manager.disconnect(websocket, room_id)
-        await manager.broadcast_state(room_id)
+        actors.release(room_id)
+        lifecycle.touch(room_id)
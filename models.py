@@ -1,8 +1,17 @@
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional, Any
+from pydantic import BaseModel, Field, PlainSerializer, PlainValidator, PrivateAttr
+import random
+import time
 import uuid
 
+from content.custom import CustomPack, custom_packs
+
+# Reseeded by Room.begin_message before every message, so all rooms can
+# share one generator (messages are applied one at a time)
+_message_rng = random.Random()
+
 class Phase(str, Enum):
     LOBBY = "LOBBY"
     INSTRUCTION = "INSTRUCTION"
@@ -11,7 +20,52 @@ class Phase(str, Enum):
     RESULT = "RESULT"
     DESCRIPTION = "DESCRIPTION"
 
-class Player(BaseModel):
+@dataclass(slots=True)
+class Deck:
+    """
+    No-repeat draws over catalog item ids 0..size-1: a Fisher-Yates shuffle
+    advanced one step per draw. Only displaced positions are stored, so a
+    deck costs O(draws so far) whatever the catalog size, and every draw is
+    O(1). Reshuffles once every id has been drawn (or the catalog resized).
+    """
+    size: int = 0
+    drawn: int = 0
+    swaps: Dict[int, int] = field(default_factory=dict)  # position -> id, where not the identity
+
+    @property
+    def remaining(self) -> int:
+        return self.size - self.drawn
+
+    def reset(self, size: Optional[int] = None):
+        if size is not None:
+            self.size = size
+        self.drawn = 0
+        self.swaps.clear()
+
+    def draw(self, rng: random.Random) -> int:
+        if self.drawn >= self.size:
+            self.reset()
+        if self.size == 0:
+            raise IndexError("draw from an empty deck")
+        i = self.drawn
+        j = rng.randrange(i, self.size)
+        item = self.swaps.pop(j, j)
+        if j != i:
+            # Position i is never read again; whatever sat there moves to j
+            self.swaps[j] = self.swaps.pop(i, i)
+        self.drawn = i + 1
+        return item
+
+# A room's own questions / word wolf pairs: validated into the one shared
+# instance for that content, stored in snapshots in the upload format
+CustomContent = Annotated[CustomPack, PlainValidator(custom_packs.load), PlainSerializer(CustomPack.dump)]
+
+# Per-player / per-submission records are slotted dataclasses: thousands of
+# them live in memory at once. Pydantic still validates and dumps them as
+# fields of the models below.
+
+@dataclass(slots=True)
+class Player:
     player_id: str
     name: str
     score: int = 0
@@ -19,7 +73,8 @@ class Player(BaseModel):
     is_connected: bool = True
     shuffle_remaining: int = 1 # One-time use
 
-class Answer(BaseModel):
+@dataclass(slots=True)
+class Answer:
     answer_id: str
     player_id: str
     player_name: str
@@ -273,7 +328,8 @@ class WordWolfState(BaseModel):
             self.wolf_won = True
             self.winning_reason = "ウルフは正体を隠し通しました！"
 
-class SekaiAnswer(BaseModel):
+@dataclass(slots=True)
+class SekaiAnswer:
     """セカイノミカタの回答"""
     answer_id: str
     player_id: str
@@ -299,10 +355,9 @@ class SekaiNoMikataState(BaseModel):
     round_number: int = 1
     winning_score: int = 5  # 勝利に必要な得点
 
-    used_questions: List[str] = []  # 使用済みお題
-    used_words: List[str] = []  # 使用済み単語（偏り防止）
 
-class ItoPlayedCard(BaseModel):
+@dataclass(slots=True)
+class ItoPlayedCard:
     """itoで出されたカード"""
     player_id: str
     player_name: str
@@ -318,7 +373,6 @@ class ItoState(BaseModel):
 
     # お題
     current_topic: str = ""
-    used_topics: List[str] = []
 
     # 各プレイヤーの数字 (player_id -> number)
     player_numbers: Dict[str, int] = {}
@@ -345,6 +399,8 @@ class Room(BaseModel):
     # Sympathy State
     current_question: Optional[str] = None
     answers: Dict[str, Answer] = Field(default_factory=dict)
+    # normalized answer -> group_id, filled as answers arrive (see SympathyGame.submit_answer)
+    answer_groups: Dict[str, str] = Field(default_factory=dict)
     
     # Word Wolf State
     word_wolf_state: Optional[WordWolfState] = None
@@ -374,10 +430,57 @@ class Room(BaseModel):
     shuffle_triggered_in_round: bool = False
     speed_star_id: Optional[str] = None
     
-    # Track used questions properly with default_factory
-    used_questions: set = Field(default_factory=set)
+    # catalog name -> no-repeat deck of its item ids (shared by all modes, see Room.draw)
+    decks: Dict[str, Deck] = Field(default_factory=dict)
+    # Content pack the current game draws from (GameEngine.start_game pins it)
+    content_id: Optional[str] = None
+    # Venue's own content, used instead of the pack's catalogs it covers (kept across games)
+    custom_pack: Optional[CustomContent] = None
     bomb_owner_id: Optional[str] = None
 
+    # Incremented by GameEngine on every accepted state change
+    version: int = 0
+
+    # (version, host_view, public_view) cache for get_view
+    _views: Optional[tuple] = PrivateAttr(default=None)
+
+    # Randomness and time for the message being applied. GameEngine seeds
+    # them per message so an event log can replay the room exactly.
+    _now: Optional[float] = PrivateAttr(default=None)
+
+    @property
+    def rng(self) -> random.Random:
+        return _message_rng
+
+    def now(self) -> float:
+        return self._now if self._now is not None else time.time()
+
+    def new_id(self) -> str:
+        """uuid4 drawn from the room's rng (replayable, unlike uuid.uuid4())."""
+        return str(uuid.UUID(int=_message_rng.getrandbits(128), version=4))
+
+    def begin_message(self, seed: int, now: float):
+        _message_rng.seed(seed)
+        self._now = now
+
+    def deck(self, catalog: str, size: int) -> Deck:
+        """This room's deck over a catalog of size items (reshuffled if the catalog changed size)."""
+        deck = self.decks.get(catalog)
+        if deck is None:
+            deck = self.decks[catalog] = Deck(size)
+        elif deck.size != size:
+            deck.reset(size)
+        return deck
+
+    def draw(self, catalog: str, size: int) -> int:
+        """Next item id of a catalog of size items; no repeats until the deck runs out."""
+        return self.deck(catalog, size).draw(self.rng)
+
+    def phase_key(self) -> tuple:
+        """Changes of this key are phase transitions (broadcast without delay)."""
+        night_phase = self.werewolf_state.night_phase if self.werewolf_state else None
+        return (self.mode, self.phase, night_phase)
+
     def add_player(self, player_id: str, name: str) -> Player:
         if player_id in self.players:
             # Reconnection logic could go here, for now just update name if needed
@@ -397,6 +500,7 @@ class Room(BaseModel):
 
     def reset_round(self):
         self.answers = {}
+        self.answer_groups = {}
         self.shuffle_triggered_in_round = False
         for p in self.players.values():
             p.has_answered = False
@@ -408,7 +512,9 @@ class Room(BaseModel):
         self.shuffle_triggered_in_round = False
         self.players = {}     # Clear all players
         self.answers = {}     # Clear all answers
-        self.used_questions = set() # Reset question history logic
+        self.answer_groups = {}
+        self.decks = {}       # Reset question history logic
+        self.content_id = None
 
     def calculate_results(self):
 
@@ -473,8 +579,7 @@ class Room(BaseModel):
             if self.bomb_owner_id in minority_players:
                 pass # Keep bomb
             else:
-                import random
-                self.bomb_owner_id = random.choice(minority_players)
+                self.bomb_owner_id = self.rng.choice(minority_players)
 
         # 4. Check Victory Condition (8+ pts without bomb)
         self.winner_id = None
@@ -487,131 +592,145 @@ class Room(BaseModel):
         """
         Create a sanitized view of the room state for a specific viewer.
         Hides secret information like Werewolf roles, other players' cards, etc.
+
+        The shared part is built once per state version (see _build_views);
+        each player only adds a small overlay with their own secrets.
         """
+        kind, shared_view, overlay = self.get_view_parts(viewer_id)
+        if not overlay:
+            return shared_view
+
+        data = dict(shared_view)
+        for section, fields in overlay.items():
+            data[section] = {**data[section], **fields}
+        return data
+
+    def get_view_parts(self, viewer_id: str) -> tuple:
+        """
+        (kind, shared_view, overlay) for a viewer. shared_view is the same
+        object for every viewer of the same kind ("host" or "player"), so it
+        can be diffed and encoded once per broadcast.
+        """
+        host_view, public_view = self._build_views()
+        if viewer_id.startswith("HOST"):
+            return "host", host_view, {}
+        return "player", public_view, self.get_view_overlay(viewer_id)
+
+    def _build_views(self):
+        """
+        Build (host_view, public_view) once per version.
+        host_view: full state minus what nobody may see yet.
+        public_view: host_view with every per-player secret removed.
+        """
+        if self._views is not None and self._views[0] == self.version:
+            return self._views[1], self._views[2]
+
         # Base full dump (deep copy via pydantic serialization to avoid mutation)
-        data = self.model_dump()
-        is_host = viewer_id.startswith("HOST")
+        # mode="json": sets and enums become plain JSON values in the same compiled pass
+        # version travels in the STATE_UPDATE envelope, not in the view; decks are server-side only
+        data = self.model_dump(mode="json", exclude={'version', 'decks', 'content_id', 'custom_pack', 'answer_groups'})
 
-        # --- Sanitize Word Wolf State ---
+        # --- Hidden from everyone (host included) ---
+
+        # Word Wolf: hide votes during discussion
         if self.mode == GameMode.WORD_WOLF and self.word_wolf_state:
-            ww_state = self.word_wolf_state
-            
-            # Hide votes during discussion
             if self.phase != Phase.RESULT:
                 data['word_wolf_state']['votes'] = {}
-            
-            # Hide Topics and Wolf IDs
-            # Logic:
-            # - Host: Can see everything? Let's say yes for now to debug/monitor.
-            # - Player: Can only see their own topic. CANNOT see wolf_ids.
-            
-            if not is_host:
-                # Sanitize Topics
-                client_topic = ww_state.topics.get(viewer_id)
-                data['word_wolf_state']['topics'] = {viewer_id: client_topic} if client_topic else {}
-                
-                # Sanitize Wolf IDs (Secrets!)
-                # Players only know if THEY are the wolf. They don't get the full wolf_ids list.
-                # Actually, client logic uses `wolf_ids.includes(myClientId)` to determine role.
-                # So we can send `wolf_ids` efficiently BUT it MUST NOT contain others.
-                
-                if viewer_id in ww_state.wolf_ids:
-                    # I am a wolf. I know I am a wolf.
-                    data['word_wolf_state']['wolf_ids'] = [viewer_id]
-                else:
-                    # I am a villager. I see empty wolf_ids list from server.
-                    data['word_wolf_state']['wolf_ids'] = []
 
-        # --- Sanitize Sekai No Mikata State ---
+        # Sekai No Mikata: hide who served which answer during Judging
+        # (You shouldn't know who wrote it when nominating your favorite)
         if self.mode == GameMode.SEKAI_NO_MIKATA and self.sekai_state:
-            # Hide other players' word choices
-            if not is_host:
-                user_choices = self.sekai_state.word_choices.get(viewer_id, [])
-                data['sekai_state']['word_choices'] = {viewer_id: user_choices}
-
-            # Hide who served which answer during Judging
-            # In Phase.ANSWERING: Hide answers completely? No, we show progress.
-            # In Phase.JUDGING: Show answers but hide `player_id` (so we don't know who wrote what).
-            # But wait, Sekai logic: "Nominate your favorite". You shouldn't know who wrote it.
-            # `all_answers_for_display` is heavily used.
-            
             if self.phase == Phase.JUDGING:
-                # Hide player names/ids in the display list
                 sanitized_list = []
                 for ans in data['sekai_state']['all_answers_for_display']:
-                    # Clone dict to avoid mutating original
                     safe_ans = ans.copy()
                     safe_ans['player_id'] = "HIDDEN"
                     safe_ans['player_name'] = "???"
-                    # Keep is_dummy? Maybe hide that too if we want perfect bluffing.
-                    # But usually "Mountain Deck" is a known entity or not?
-                    # Let's keep is_dummy strictly hidden if we want players to guess.
-                    # Current rules: Just pick the best answer.
                     sanitized_list.append(safe_ans)
                 data['sekai_state']['all_answers_for_display'] = sanitized_list
 
-        # --- Sanitize Ito State ---
+        # Sympathy: clear all answer texts while answering
+        # (`has_answered` in Player model covers the status)
+        if self.mode == GameMode.SYMPATHY:
+            if self.phase == Phase.ANSWERING:
+                data['answers'] = {}
+
+        host_view = data
+
+        # --- Hidden from players (re-added per viewer by get_view_overlay) ---
+        public = dict(host_view)
+
+        if self.mode == GameMode.WORD_WOLF and self.word_wolf_state:
+            # Players only know their own topic and whether THEY are the wolf
+            public['word_wolf_state'] = {**public['word_wolf_state'], 'topics': {}, 'wolf_ids': []}
+
+        if self.mode == GameMode.SEKAI_NO_MIKATA and self.sekai_state:
+            # Hide other players' word choices
+            public['sekai_state'] = {**public['sekai_state'], 'word_choices': {}}
+
         if self.mode == GameMode.ITO and self.ito_state:
             # Hide other players' numbers!
-            if not is_host:
-                my_number = self.ito_state.player_numbers.get(viewer_id)
-                data['ito_state']['player_numbers'] = {viewer_id: my_number} if my_number else {}
+            public['ito_state'] = {**public['ito_state'], 'player_numbers': {}}
 
-        # --- Sanitize One Night Werewolf State ---
         if self.mode == GameMode.ONE_NIGHT_WEREWOLF and self.werewolf_state:
-            wf_state = self.werewolf_state
-            
-            # Hide Original Roles (The most critical part)
-            # Host can see all? Maybe.
-            if not is_host:
-                 # Only show MY role
-                my_role = wf_state.original_roles.get(viewer_id)
-                data['werewolf_state']['original_roles'] = {viewer_id: my_role} if my_role else {}
-                
-                # Hide Graveyard completely
-                data['werewolf_state']['graveyard'] = []
-                
-                # Hide Current Roles (Thief results etc)
-                data['werewolf_state']['current_roles'] = {}
-
-                # Hide Night Info - but show MY OWN night info
-                my_night_info = wf_state.night_info.get(viewer_id)
-                data['werewolf_state']['night_info'] = {viewer_id: my_night_info} if my_night_info else {}
-
-                # Hide Individual Votes during voting phase (show only count or nothing?)
-                # Usually voting is simultaneous.
-                if self.phase != Phase.RESULT:
-                     data['werewolf_state']['votes'] = {}
-
-                # Special Case: Werewolves can see other Werewolves
-                # But we handled that in client logic? `werewolfPartnerInfo` needs data.
-                if my_role == WerewolfRole.WEREWOLF:
-                    # Provide partner info specifically
-                    # We can inject a synthetic "partners" field or just expose those IDs in `original_roles`
-                    # Exposing in `original_roles` is cleaner so client logic works.
-                    partners = {pid: role for pid, role in wf_state.original_roles.items() if role == WerewolfRole.WEREWOLF}
-                    data['werewolf_state']['original_roles'].update(partners)
-
-        # --- Sanitize Sympathy Answers (Bluffing Phase) ---
-        if self.mode == GameMode.SYMPATHY:
-            # During ANSWERING: Hide answers from others (but we need to know WHO answered)
-            # `has_answered` in Player model covers the status.
-            # `answers` dict contains the text.
-            
-            if self.phase == Phase.ANSWERING:
-                # Clear all answer texts
-                data['answers'] = {}
+            # Hide roles, graveyard, thief results and night info
+            wf_public = {
+                **public['werewolf_state'],
+                'original_roles': {},
+                'graveyard': [],
+                'current_roles': {},
+                'night_info': {},
+            }
+            # Voting is simultaneous: hide individual votes until the result
+            if self.phase != Phase.RESULT:
+                wf_public['votes'] = {}
+            public['werewolf_state'] = wf_public
 
-            # During JUDGING: We need to see texts to group them.
-            # But DO WE need to see WHO wrote what?
-            # Sympathy rules: "Guess who wrote what" or just "Group same meanings"?
-            # Actually Sympathy is "Synchronize with others".
-            # If I see "Apple" and I know "Tamkai" wrote it, I might join.
-            # The game UI shows cards.
-            # Let's keep Sympathy open for now as it's cooperative-ish.
-            pass
+        self._views = (self.version, host_view, public)
+        return host_view, public
 
-        return data
+    def get_view_overlay(self, viewer_id: str) -> Dict[str, dict]:
+        """
+        Per-player secrets to lay over the public view.
+        Returns {state_section: {field: value}}; fields replace the public ones.
+        """
+        overlay: Dict[str, dict] = {}
+
+        if self.mode == GameMode.WORD_WOLF and self.word_wolf_state:
+            ww_state = self.word_wolf_state
+            client_topic = ww_state.topics.get(viewer_id)
+            # Client logic uses `wolf_ids.includes(myClientId)` to determine role
+            overlay['word_wolf_state'] = {
+                'topics': {viewer_id: client_topic} if client_topic else {},
+                'wolf_ids': [viewer_id] if viewer_id in ww_state.wolf_ids else [],
+            }
+
+        if self.mode == GameMode.SEKAI_NO_MIKATA and self.sekai_state:
+            user_choices = self.sekai_state.word_choices.get(viewer_id, [])
+            overlay['sekai_state'] = {'word_choices': {viewer_id: list(user_choices)}}
+
+        if self.mode == GameMode.ITO and self.ito_state:
+            my_number = self.ito_state.player_numbers.get(viewer_id)
+            overlay['ito_state'] = {'player_numbers': {viewer_id: my_number} if my_number else {}}
+
+        if self.mode == GameMode.ONE_NIGHT_WEREWOLF and self.werewolf_state:
+            wf_state = self.werewolf_state
+            my_role = wf_state.original_roles.get(viewer_id)
+            original_roles = {viewer_id: my_role.value} if my_role else {}
+
+            # Werewolves can see other Werewolves
+            # (exposed in `original_roles` so `werewolfPartnerInfo` on the client works)
+            if my_role == WerewolfRole.WEREWOLF:
+                partners = {pid: role.value for pid, role in wf_state.original_roles.items() if role == WerewolfRole.WEREWOLF}
+                original_roles.update(partners)
+
+            my_night_info = wf_state.night_info.get(viewer_id)
+            overlay['werewolf_state'] = {
+                'original_roles': original_roles,
+                'night_info': {viewer_id: my_night_info} if my_night_info else {},
+            }
+
+        return overlay
 
     def handle_seer_peek(self, client_id: str, target: str) -> str:
         """
@@ -0,0 +1,8 @@
+from .delta import make_patch
+from .encoding import FrameEncoder, negotiate_encoder
+from .frames import FrameCache
+from .connection import ClientConnection
+from .manager import ConnectionManager
+from .actor import RoomActor, RoomActors
+
+__all__ = ['make_patch', 'FrameEncoder', 'negotiate_encoder', 'FrameCache', 'ClientConnection', 'ConnectionManager', 'RoomActor', 'RoomActors']
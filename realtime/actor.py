@@ -0,0 +1,156 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from fastapi import WebSocket
+
+if TYPE_CHECKING:
+    from game_engine import GameEngine
+    from models import Room
+    from store import RoomStore
+    from .manager import ConnectionManager
+
+_STOP = object()
+
+
+class RoomActor:
+    """
+    Owns one room: every message for it goes through the inbox and is
+    applied by a single task, in arrival order, followed by its broadcast.
+    Socket tasks never touch the Room themselves.
+    """
+
+    def __init__(self, room_id: str, engine: 'GameEngine', manager: 'ConnectionManager', store: 'RoomStore',
+                 on_phase_change: Optional[List[Callable[[str], None]]] = None):
+        self.room_id = room_id
+        self.engine = engine
+        self.manager = manager
+        self.store = store
+        self.on_phase_change = on_phase_change if on_phase_change is not None else []
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        # Set by stop(); the task exits once the inbox is empty, unless resume() comes first
+        self.stopping = False
+        self._task = asyncio.ensure_future(self._run())
+
+    def post(self, client_id: str, websocket: Optional[WebSocket], msg_type: str, payload: dict):
+        self.inbox.put_nowait((client_id, websocket, msg_type, payload, None, None))
+
+    async def call(self, client_id: str, msg_type: str, payload: dict,
+                   check: Optional[Callable[['Room'], None]] = None) -> bool:
+        """
+        Queue a message that has no socket (HTTP API) and wait until it is
+        applied; True if it changed the room. check(room) runs first, in
+        order with the room's other messages; whatever it raises is raised
+        here and the message is dropped.
+        """
+        result = asyncio.get_running_loop().create_future()
+        self.inbox.put_nowait((client_id, None, msg_type, payload, check, result))
+        return await result
+
+    def stop(self):
+        """Finish what is already in the inbox, then exit."""
+        self.stopping = True
+        self.inbox.put_nowait(_STOP)
+
+    def resume(self):
+        """Keep running after a stop() that has not taken effect yet."""
+        self.stopping = False
+
+    @property
+    def done(self) -> bool:
+        return self._task.done()
+
+    async def _run(self):
+        while True:
+            item = await self.inbox.get()
+            if item is _STOP:
+                if self.stopping and self.inbox.empty():
+                    return
+                continue
+            *message, check, result = item
+            try:
+                changed = await self.handle(*message, check=check)
+                if result is not None and not result.done():
+                    result.set_result(changed)
+            except Exception as e:
+                if result is None:
+                    print(f"Error in room {self.room_id} handling {message[2]}: {e}")
+                elif not result.done():
+                    # The caller reports it
+                    result.set_exception(e)
+
+    async def handle(self, client_id: str, websocket: Optional[WebSocket], msg_type: str, payload: dict,
+                     check: Optional[Callable[['Room'], None]] = None) -> bool:
+        if msg_type == "RESYNC":
+            await self.manager.resync(self.room_id, websocket)
+            return False
+
+        async with self.store.transaction(self.room_id) as room:
+            if check is not None:
+                check(room)
+            # Special Handling for PEEK which is personal
+            if msg_type == "WEREWOLF_PEEK":
+                target = payload.get("target")
+                result = room.handle_seer_peek(client_id, target)
+                await self.manager.send_personal_message(websocket, {
+                    "type": "WEREWOLF_PEEK_RESULT",
+                    "data": {"result": result, "target": target}
+                })
+                return False
+
+            phase_before = room.phase_key()
+            changed = self.engine.process_message(room, client_id, msg_type, payload)
+            if changed:
+                phase_changed = room.phase_key() != phase_before
+                # Phase transitions skip the coalescing window
+                await self.manager.broadcast_state(self.room_id, immediate=phase_changed)
+                if phase_changed:
+                    for callback in self.on_phase_change:
+                        callback(self.room_id)
+            return changed
+
+
+class RoomActors:
+    """
+    room_id -> RoomActor, started on first use and stopped once the room has
+    no sockets. A stopped actor stays in the map until its inbox is drained,
+    so a client reconnecting meanwhile gets the same actor back and a room
+    never has two tasks applying messages.
+    """
+
+    def __init__(self, engine: 'GameEngine', manager: 'ConnectionManager', store: 'RoomStore'):
+        self.engine = engine
+        self.manager = manager
+        self.store = store
+        self.actors: Dict[str, RoomActor] = {}
+        # Called with room_id after a message moved a room to another phase
+        self.on_phase_change: List[Callable[[str], None]] = []
+
+    def get(self, room_id: str) -> RoomActor:
+        actor = self.actors.get(room_id)
+        if actor is None or actor.done:
+            actor = RoomActor(room_id, self.engine, self.manager, self.store, self.on_phase_change)
+            self.actors[room_id] = actor
+            actor._task.add_done_callback(lambda _: self._forget(actor))
+        else:
+            actor.resume()
+        return actor
+
+    def release(self, room_id: str):
+        if self.manager.connection_count(room_id) == 0:
+            actor = self.actors.get(room_id)
+            if actor:
+                actor.stop()
+
+    def _forget(self, actor: RoomActor):
+        if self.actors.get(actor.room_id) is actor:
+            del self.actors[actor.room_id]
+
+    async def stop_all(self, timeout: float = 5.0):
+        """Drain: let every actor finish its inbox, then exit (used before a handoff)."""
+        actors = list(self.actors.values())
+        self.actors.clear()
+        for actor in actors:
+            actor.stop()
+        pending = [actor._task for actor in actors if not actor.done]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
@@ -0,0 +1,73 @@
+"""
+大きなSTATE_UPDATEの圧縮（接続ごとにネゴシエーション）
+
+サブプロトコル sympathy.deflate を選んだ接続では、しきい値以上のJSONフレームを
+raw deflate したバイナリフレームで送る。小さいフレームはテキストのまま。
+ブラウザ側は DecompressionStream('deflate-raw') で展開する（state_sync.js）。
+
+トランスポートの permessage-deflate は全フレームを無条件に圧縮し、効果も
+計測できないため、Procfile / render.yaml では無効にしている。
+"""
+import time
+import zlib
+from typing import Dict
+
+from .encoding import Frame
+
+# Frames shorter than this (bytes of JSON) are sent uncompressed
+COMPRESS_THRESHOLD = 1024
+COMPRESS_LEVEL = 6
+
+
+class CompressionStats:
+    """Per game mode: frames compressed, bytes before/after and CPU spent."""
+
+    def __init__(self):
+        self._modes: Dict[str, Dict[str, float]] = {}
+
+    def record(self, mode: str, raw_bytes: int, sent_bytes: int, cpu_seconds: float, compressed: bool):
+        entry = self._modes.setdefault(mode, {
+            "frames": 0, "compressed_frames": 0, "raw_bytes": 0, "sent_bytes": 0, "cpu_seconds": 0.0,
+        })
+        entry["frames"] += 1
+        entry["raw_bytes"] += raw_bytes
+        entry["sent_bytes"] += sent_bytes
+        if compressed:
+            entry["compressed_frames"] += 1
+            entry["cpu_seconds"] += cpu_seconds
+
+    def report(self) -> dict:
+        report = {}
+        for mode, entry in self._modes.items():
+            compressed = entry["compressed_frames"]
+            report[mode] = {
+                "frames": entry["frames"],
+                "compressed_frames": compressed,
+                "raw_bytes": entry["raw_bytes"],
+                "sent_bytes": entry["sent_bytes"],
+                "ratio": round(entry["sent_bytes"] / entry["raw_bytes"], 3) if entry["raw_bytes"] else None,
+                "cpu_us_per_compressed_frame": round(entry["cpu_seconds"] / compressed * 1e6, 1) if compressed else None,
+            }
+        return report
+
+
+class Compressor:
+    def __init__(self, stats: CompressionStats, threshold: int = COMPRESS_THRESHOLD, level: int = COMPRESS_LEVEL):
+        self.stats = stats
+        self.threshold = threshold
+        self.level = level
+
+    def compress(self, frame: Frame, mode: str) -> Frame:
+        """Deflate a text frame at or above the threshold; everything else passes through."""
+        if not isinstance(frame, str):
+            return frame
+        data = frame.encode("utf-8")
+        if len(data) < self.threshold:
+            self.stats.record(mode, len(data), len(data), 0.0, False)
+            return frame
+
+        started = time.perf_counter()
+        deflater = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        compressed = deflater.compress(data) + deflater.flush()
+        self.stats.record(mode, len(data), len(compressed), time.perf_counter() - started, True)
+        return compressed
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+from fastapi import WebSocket
+
+from .compression import Compressor
+from .encoding import Frame, FrameEncoder
+from .frames import FrameCache
+
+# Per-socket deadline for a single send; slower sockets are flagged as stalled (seconds)
+SEND_TIMEOUT = 2.0
+# Personal messages allowed to wait for a slow socket before it is closed
+MAX_OUTBOX = 32
+
+
+class ClientConnection:
+    """
+    One WebSocket with its own writer task.
+
+    The outbox holds at most one pending STATE_UPDATE: newer updates replace
+    it, and the view is taken from view_source only when the writer is ready
+    to send, so a slow client always gets the latest state and never a
+    backlog of stale snapshots. The shared body comes from the room's
+    FrameCache; only the private overlay is encoded per socket. Personal messages are queued in order and
+    never dropped; if more than max_outbox pile up the socket is closed and
+    the client reconnects with a fresh snapshot.
+
+    on_broken(connection, reason) is called once when the socket has to go
+    (failed send, full outbox) so the manager can reap it.
+    """
+
+    def __init__(self, websocket: WebSocket, room_id: str, client_id: str, encoder: FrameEncoder,
+                 view_source: Callable[[], Tuple[int, str, dict, dict]], frames: FrameCache,
+                 send_timeout: float = SEND_TIMEOUT, max_outbox: int = MAX_OUTBOX,
+                 compressor: Optional[Compressor] = None, resume_from: Optional[int] = None):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.client_id = client_id
+        self.encoder = encoder
+        self.view_source = view_source
+        self.frames = frames
+        self.send_timeout = send_timeout
+        self.max_outbox = max_outbox
+        # Only for sockets that negotiated sympathy.deflate
+        self.compressor = compressor if encoder.compress else None
+        # Game mode of the last state sent, for per-mode compression stats
+        self.mode = ""
+
+        # (version, shared view) last sent, base for the next patch
+        self.synced: Optional[Tuple[int, dict]] = None
+        self.synced_private: Optional[dict] = None
+        # Version the client already has (session resume); first frame replays only what it missed
+        self.resume_from = resume_from
+        # True while the last send missed the deadline
+        self.stalled = False
+        self.closed = False
+        # monotonic time of the last message received from the client
+        self.last_seen = time.monotonic()
+        self.on_broken: Optional[Callable[['ClientConnection', str], None]] = None
+        # Called with True if a resume was served from history, False if it fell back to a snapshot
+        self.on_resume: Optional[Callable[[bool], None]] = None
+
+        self._state_pending = False
+        self._sending = False
+        self._outbox: Deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.ensure_future(self._run())
+
+    def close(self):
+        self.closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+
+    def queue_state(self, resync: bool = False):
+        """Mark state dirty; coalesces with any update not yet sent."""
+        if resync:
+            self.synced = None
+        self._state_pending = True
+        self._wakeup.set()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def queue_message(self, message: dict):
+        if self.closed:
+            return
+        if len(self._outbox) >= self.max_outbox:
+            print(f"Outbox full, closing {self.room_id}/{self.client_id}")
+            self._broken("outbox_full")
+            return
+        self._outbox.append(message)
+        self._wakeup.set()
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                while self._outbox:
+                    await self._send(self.encoder.encode(self._outbox.popleft()))
+
+                if self._state_pending:
+                    self._state_pending = False
+                    frame = self._state_frame()
+                    if frame is not None:
+                        await self._send(frame)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self._broken("send_failed")
+
+    def _broken(self, reason: str):
+        if self.closed:
+            return
+        self.close()
+        if self.on_broken:
+            self.on_broken(self, reason)
+
+    async def _send(self, frame: Frame):
+        if self.compressor is not None:
+            frame = self.compressor.compress(frame, self.mode)
+        if isinstance(frame, bytes):
+            send = asyncio.ensure_future(self.websocket.send_bytes(frame))
+        else:
+            send = asyncio.ensure_future(self.websocket.send_text(frame))
+
+        self._sending = True
+        try:
+            done, _ = await asyncio.wait([send], timeout=self.send_timeout)
+            if not done:
+                # Only this socket's writer waits; updates meanwhile coalesce
+                self.stalled = True
+                await send
+        finally:
+            self._sending = False
+        self.stalled = False
+        send.result()
+
+    def _state_frame(self) -> Optional[Frame]:
+        """
+        Full snapshot for a new socket (or only the missed updates if it is
+        resuming), otherwise a patch against the last version this socket
+        was sent. None if nothing changed for it.
+        """
+        version, kind, view_data, overlay = self.view_source()
+        self.mode = view_data.get("mode", "")
+        private = overlay or None
+
+        if self.resume_from is not None:
+            since, self.resume_from = self.resume_from, None
+            shared = self.frames.resumed(version, kind, view_data, since, self.encoder)
+            if self.on_resume:
+                self.on_resume(shared is not None)
+            if shared is not None:
+                self.synced = (version, view_data)
+                self.synced_private = private
+                return self.encoder.finish(shared, private)
+
+        shared, changed = self.frames.shared(version, kind, view_data, self.synced, self.encoder)
+        if not changed and private == self.synced_private:
+            return None
+        self.synced = (version, view_data)
+        self.synced_private = private
+        return self.encoder.finish(shared, private)
+
+    async def close_after_flush(self, code: int, timeout: float):
+        """Give the writer up to timeout to send what is queued, then close the socket."""
+        deadline = time.monotonic() + timeout
+        while (self._outbox or self._state_pending or self._sending) and not self.closed:
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.02)
+        await self.close_socket(code)
+
+    async def close_socket(self, code: int = 1011):
+        self.close()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
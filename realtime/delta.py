@@ -0,0 +1,48 @@
+"""
+STATE_UPDATE差分（JSON Patch, RFC 6902 の add/remove/replace のみ）
+
+クライアントは最後に受け取ったバージョンのビューにパッチを当てる。
+対応するJS実装は static/js/state_sync.js
+"""
+from typing import Any, List
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def make_patch(old: Any, new: Any) -> List[dict]:
+    """Return the ops that turn `old` into `new` (empty list if equal)."""
+    ops: List[dict] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[dict]):
+    if old == new and type(old) is type(new):
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) == len(new):
+            for i, (a, b) in enumerate(zip(old, new)):
+                _diff(a, b, f"{path}/{i}", ops)
+            return
+        if len(new) > len(old) and new[:len(old)] == old:
+            # 追記のみ（played_cards など）
+            for i in range(len(old), len(new)):
+                ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+            return
+
+    ops.append({"op": "replace", "path": path, "value": new})
@@ -0,0 +1,88 @@
+"""
+送信フレームのエンコーダ
+
+ビューは Room.get_view が model_dump(mode="json") で作ったJSONネイティブな
+dict なので、ここでは default= のPythonフォールバックなしで一度に書き出す。
+接続ごとに WebSocket サブプロトコルで MessagePack を選べる。
+
+STATE_UPDATE は共有部分（全員同じバイト列）を一度だけエンコードし、
+各プレイヤーの "private" フィールドだけを後から継ぎ足す。
+"""
+import json
+from typing import Iterable, NamedTuple, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_SUBPROTOCOL = "sympathy.json"
+MSGPACK_SUBPROTOCOL = "sympathy.msgpack"
+# JSON, with large frames deflated into binary frames (see compression.py)
+DEFLATE_SUBPROTOCOL = "sympathy.deflate"
+
+Frame = Union[str, bytes]
+
+
+class SharedFrame(NamedTuple):
+    """Encoded message minus its closing: a JSON object without '}' or MessagePack map entries."""
+    head: Frame
+    count: int
+
+
+class FrameEncoder:
+    """Encodes outbound messages; text frames for JSON, binary for MessagePack."""
+
+    def __init__(self, subprotocol: Optional[str] = None):
+        self.subprotocol = subprotocol
+        self.binary = subprotocol == MSGPACK_SUBPROTOCOL
+        self.compress = subprotocol == DEFLATE_SUBPROTOCOL
+
+    def encode(self, message: dict) -> Frame:
+        if self.binary:
+            return msgpack.packb(message)
+        if orjson is not None:
+            return orjson.dumps(message).decode("utf-8")
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+    def encode_shared(self, message: dict) -> SharedFrame:
+        if self.binary:
+            head = b"".join(msgpack.packb(k) + msgpack.packb(v) for k, v in message.items())
+            return SharedFrame(head, len(message))
+        return SharedFrame(self.encode(message)[:-1], len(message))
+
+    def finish(self, shared: SharedFrame, private: Optional[dict] = None) -> Frame:
+        """Complete a shared frame, adding this socket's "private" field if any."""
+        if self.binary:
+            count = shared.count + (1 if private else 0)
+            frame = _map_header(count) + shared.head
+            if private:
+                frame += msgpack.packb("private") + msgpack.packb(private)
+            return frame
+        if private:
+            return shared.head + ',"private":' + self.encode(private) + "}"
+        return shared.head + "}"
+
+
+def _map_header(count: int) -> bytes:
+    if count < 16:
+        return bytes([0x80 | count])
+    return b"\xde" + count.to_bytes(2, "big")
+
+
+def negotiate_encoder(offered: Iterable[str]) -> FrameEncoder:
+    """
+    Pick the encoding from the client's Sec-WebSocket-Protocol offer.
+    Browsers that offer nothing get plain JSON without a subprotocol.
+    """
+    for subprotocol in offered:
+        if subprotocol == MSGPACK_SUBPROTOCOL and msgpack is not None:
+            return FrameEncoder(MSGPACK_SUBPROTOCOL)
+        if subprotocol in (JSON_SUBPROTOCOL, DEFLATE_SUBPROTOCOL):
+            return FrameEncoder(subprotocol)
+    return FrameEncoder()
@@ -0,0 +1,62 @@
+from typing import Dict, Optional, Tuple
+
+from .delta import make_patch
+from .encoding import FrameEncoder, SharedFrame
+from .history import UpdateHistory
+
+
+class FrameCache:
+    """
+    STATE_UPDATE bodies of one room, shared between sockets.
+
+    Everyone who sees the same view (all players, or the host) and was last
+    sent the same version gets a byte-identical body, so diffing and
+    encoding run once per group instead of once per socket. Each socket
+    then only encodes its small private overlay (see FrameEncoder.finish).
+    Entries are dropped as soon as the room version moves on. Every view
+    passing through is recorded in the room's UpdateHistory, whose patches
+    are reused here and replayed to resuming sockets.
+    """
+
+    def __init__(self, history: Optional[UpdateHistory] = None):
+        self.history = history if history is not None else UpdateHistory()
+        self.version: Optional[int] = None
+        # (view kind, base version, subprotocol) -> (body, changed)
+        self._bodies: Dict[tuple, Tuple[SharedFrame, bool]] = {}
+
+    def shared(self, version: int, kind: str, view: dict,
+               base: Optional[Tuple[int, dict]], encoder: FrameEncoder) -> Tuple[SharedFrame, bool]:
+        """Body for a socket last sent `base` (None: full snapshot); changed=False if the view is the same."""
+        if version != self.version:
+            self._bodies.clear()
+            self.version = version
+        self.history.record(kind, version, view)
+
+        key = (kind, base[0] if base else None, encoder.subprotocol)
+        cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+
+        if base is None:
+            message = {"type": "STATE_UPDATE", "version": version, "data": view}
+            changed = True
+        else:
+            base_version, base_view = base
+            patch = self.history.step(kind, base_version, version)
+            if patch is None:
+                patch = make_patch(base_view, view)
+            message = {"type": "STATE_UPDATE", "version": version, "base_version": base_version, "patch": patch}
+            changed = bool(patch)
+
+        body = (encoder.encode_shared(message), changed)
+        self._bodies[key] = body
+        return body
+
+    def resumed(self, version: int, kind: str, view: dict, since: int,
+                encoder: FrameEncoder) -> Optional[SharedFrame]:
+        """Body replaying everything after `since` for a resuming socket; None if history no longer reaches back."""
+        self.history.record(kind, version, view)
+        patch = self.history.since(kind, since)
+        if patch is None:
+            return None
+        return encoder.encode_shared({"type": "STATE_UPDATE", "version": version, "base_version": since, "patch": patch})
@@ -0,0 +1,64 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .delta import make_patch
+
+# Versions of recent history kept per room and view kind
+RING_SIZE = 64
+# A resume needing more ops than this gets a snapshot instead
+RESUME_MAX_OPS = 500
+
+
+class UpdateHistory:
+    """
+    Ring buffer of the patches between consecutive shared views of one room
+    ("host" and "player" kinds separately). A reconnecting socket that
+    presents the last version it saw is brought up to date by chaining the
+    patches since then; outlives the room's sockets, dropped with the room.
+    """
+
+    def __init__(self, size: int = RING_SIZE, max_ops: int = RESUME_MAX_OPS):
+        self.size = size
+        self.max_ops = max_ops
+        # kind -> (version, view) last recorded
+        self._latest: Dict[str, Tuple[int, dict]] = {}
+        # kind -> (base_version, version, patch), oldest first
+        self._patches: Dict[str, Deque[Tuple[int, int, list]]] = {}
+
+    def record(self, kind: str, version: int, view: dict):
+        latest = self._latest.get(kind)
+        if latest is not None:
+            if latest[0] == version:
+                return
+            if version > latest[0]:
+                ring = self._patches.setdefault(kind, deque(maxlen=self.size))
+                ring.append((latest[0], version, make_patch(latest[1], view)))
+            else:
+                # Room was recreated: versions started over
+                self._patches.pop(kind, None)
+        self._latest[kind] = (version, view)
+
+    def step(self, kind: str, base_version: int, version: int) -> Optional[list]:
+        """The recorded patch from base_version straight to version, if that is the latest step."""
+        ring = self._patches.get(kind)
+        if ring and ring[-1][0] == base_version and ring[-1][1] == version:
+            return ring[-1][2]
+        return None
+
+    def since(self, kind: str, version: int) -> Optional[list]:
+        """Ops from `version` to the latest recorded view, or None if that gap cannot be replayed."""
+        latest = self._latest.get(kind)
+        if latest is None:
+            return None
+        if latest[0] == version:
+            return []
+        ops: Optional[List[dict]] = None
+        for base_version, _, patch in self._patches.get(kind, ()):
+            if ops is None:
+                if base_version != version:
+                    continue
+                ops = []
+            ops.extend(patch)
+            if len(ops) > self.max_ops:
+                return None
+        return ops
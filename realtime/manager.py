@@ -0,0 +1,208 @@
+import asyncio
+import random
+import secrets
+import time
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+
+from models import get_or_create_room
+from .compression import CompressionStats, Compressor
+from .connection import ClientConnection, SEND_TIMEOUT
+from .encoding import negotiate_encoder
+from .frames import FrameCache
+from .history import UpdateHistory
+from .registry import ConnectionRegistry
+
+# Broadcasts requested within this window are merged into one (seconds, 0 disables)
+BROADCAST_WINDOW = 0.02
+# App-level PING every interval; sockets silent for longer than the timeout are reaped (seconds)
+HEARTBEAT_INTERVAL = 15.0
+HEARTBEAT_TIMEOUT = 45.0
+
+# Close codes per reap reason
+_CLOSE_CODES = {
+    "outbox_full": 1013,  # Try Again Later
+    "heartbeat": 1001,    # Going Away
+    "send_failed": 1011,
+}
+# Sockets closed by a deploy drain come back after a random delay in this range (ms),
+# so a full server does not reconnect in one burst
+RECONNECT_JITTER_MS = (500, 3000)
+
+
+class ConnectionManager:
+    def __init__(self, send_timeout: float = SEND_TIMEOUT, broadcast_window: float = BROADCAST_WINDOW,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL, heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.registry = ConnectionRegistry()
+        self.send_timeout = send_timeout
+        self.broadcast_window = broadcast_window
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        # room_id -> scheduled flush of a coalesced broadcast
+        self._pending_broadcasts: Dict[str, asyncio.TimerHandle] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        # room_id -> shared STATE_UPDATE bodies (while the room has sockets)
+        self._frames: Dict[str, FrameCache] = {}
+        # room_id -> recent updates for resuming sockets (while the room exists)
+        self._history: Dict[str, UpdateHistory] = {}
+        # room_id -> client_id -> resume token
+        self.sessions: Dict[str, Dict[str, str]] = {}
+        self.resumes = {"replayed": 0, "snapshot": 0}
+        # reason -> number of sockets reaped
+        self.reaped: Dict[str, int] = {reason: 0 for reason in _CLOSE_CODES}
+        self.compression = CompressionStats()
+        self.compressor = Compressor(self.compression)
+
+    async def connect(self, room_id: str, client_id: str, websocket: WebSocket):
+        """Accept the socket and queue its first state (only for it; the rest of the room is not woken)."""
+        encoder = negotiate_encoder(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=encoder.subprotocol)
+
+        def view_source():
+            room = get_or_create_room(room_id)
+            return (room.version, *room.get_view_parts(client_id))
+
+        frames = self._frames.get(room_id)
+        if frames is None:
+            frames = self._frames[room_id] = FrameCache(self._history.setdefault(room_id, UpdateHistory()))
+        connection = ClientConnection(websocket, room_id, client_id, encoder, view_source, frames,
+                                      send_timeout=self.send_timeout, compressor=self.compressor,
+                                      resume_from=self._resume_point(room_id, client_id, websocket))
+        connection.on_broken = self._reap
+        connection.on_resume = self._count_resume
+        connection.start()
+        self.registry.add(connection)
+
+        token = self.sessions.setdefault(room_id, {}).setdefault(client_id, secrets.token_urlsafe(16))
+        connection.queue_message({"type": "SESSION", "data": {"resume_token": token}})
+        connection.queue_state()
+
+        if self._heartbeat is None and self.heartbeat_interval > 0:
+            self._heartbeat = asyncio.ensure_future(self._run_heartbeat())
+
+    def _resume_point(self, room_id: str, client_id: str, websocket: WebSocket) -> Optional[int]:
+        """Last version the client saw, if it presented this client's resume token (?resume=...&v=...)."""
+        token = websocket.query_params.get("resume")
+        version = websocket.query_params.get("v", "")
+        expected = self.sessions.get(room_id, {}).get(client_id)
+        if not token or not version.isdigit() or expected is None:
+            return None
+        if not secrets.compare_digest(token, expected):
+            return None
+        return int(version)
+
+    def _count_resume(self, replayed: bool):
+        self.resumes["replayed" if replayed else "snapshot"] += 1
+
+    def disconnect(self, websocket: WebSocket, room_id: str):
+        connection = self.registry.remove(websocket)
+        if connection:
+            connection.close()
+        self._forget_room(room_id)
+
+    def _forget_room(self, room_id: str):
+        if self.registry.room_count(room_id) == 0:
+            self._frames.pop(room_id, None)
+
+    def forget_room(self, room_id: str):
+        """The room is gone (evicted): drop its resume history and tokens."""
+        self._history.pop(room_id, None)
+        self.sessions.pop(room_id, None)
+
+    def adopt_sessions(self, room_id: str, tokens: Dict[str, str]):
+        """Resume tokens handed off by the previous process (Handoff.on_adopt)."""
+        # The adopted room replaces any local copy: its versions mean something else now
+        self._history.pop(room_id, None)
+        self._forget_room(room_id)
+        self.sessions.setdefault(room_id, {}).update(tokens)
+
+    async def send_reconnect(self, timeout: float = 2.0):
+        """
+        Deploy drain: flush pending broadcasts, tell every socket to reconnect
+        (after a jittered delay, resuming with its token), then close it with
+        1012 Service Restart once its outbox is sent.
+        """
+        for room_id in list(self._pending_broadcasts):
+            self._flush(room_id)
+        closing = []
+        for connection in list(self.registry.all()):
+            self.registry.remove(connection.websocket)
+            connection.queue_message({"type": "RECONNECT", "data": {
+                "resume_token": self.sessions.get(connection.room_id, {}).get(connection.client_id),
+                "retry_ms": random.randint(*RECONNECT_JITTER_MS),
+            }})
+            closing.append(connection.close_after_flush(1012, timeout))
+        if closing:
+            await asyncio.gather(*closing)
+
+    def touch(self, websocket: WebSocket):
+        """Any message from the client (including PONG) proves the socket is alive."""
+        connection = self.registry.get(websocket)
+        if connection:
+            connection.touch()
+
+    def get_room(self, room_id: str):
+        return get_or_create_room(room_id)
+
+    def connection_count(self, room_id: str) -> int:
+        return self.registry.room_count(room_id)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.registry),
+            "stalled": sum(1 for c in self.registry.all() if c.stalled),
+            "reaped": dict(self.reaped),
+            "resumes": dict(self.resumes),
+            "compression": self.compression.report(),
+        }
+
+    async def send_personal_message(self, websocket: WebSocket, message: dict):
+        connection = self.registry.get(websocket)
+        if connection:
+            connection.queue_message(message)
+
+    async def broadcast_state(self, room_id: str, immediate: bool = False):
+        """
+        Queue the latest state on every socket of the room; never waits on sends.
+        Bursts (answers, votes) within broadcast_window go out as one broadcast;
+        immediate=True (phase transitions) flushes right away.
+        """
+        if immediate or self.broadcast_window <= 0:
+            self._flush(room_id)
+        elif room_id not in self._pending_broadcasts:
+            loop = asyncio.get_running_loop()
+            self._pending_broadcasts[room_id] = loop.call_later(self.broadcast_window, self._flush, room_id)
+
+    def _flush(self, room_id: str):
+        pending = self._pending_broadcasts.pop(room_id, None)
+        if pending:
+            pending.cancel()
+        for connection in self.registry.in_room(room_id):
+            connection.queue_state()
+
+    async def resync(self, room_id: str, websocket: WebSocket):
+        """Client missed a version: send it a full snapshot."""
+        connection = self.registry.get(websocket)
+        if connection:
+            connection.queue_state(resync=True)
+
+    def _reap(self, connection: ClientConnection, reason: str):
+        """Drop a dead or hopelessly slow socket; its receive loop then ends on its own."""
+        if self.registry.remove(connection.websocket) is None:
+            return
+        self.reaped[reason] += 1
+        self._forget_room(connection.room_id)
+        print(f"Reaped {connection.room_id}/{connection.client_id}: {reason}")
+        asyncio.ensure_future(connection.close_socket(_CLOSE_CODES[reason]))
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for connection in self.registry.all():
+                if now - connection.last_seen > self.heartbeat_timeout:
+                    # Half-open: mobile went away without a close frame
+                    self._reap(connection, "heartbeat")
+                else:
+                    connection.queue_message({"type": "PING"})
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import WebSocket
+
+from .connection import ClientConnection
+
+
+class ConnectionRegistry:
+    """
+    Live connections indexed by socket, by room and by (room, client).
+    All lookups, adds and removes are O(1); a client may hold several
+    sockets (e.g. a second tab) during a reconnect.
+    """
+
+    def __init__(self):
+        self._by_socket: Dict[WebSocket, ClientConnection] = {}
+        self._by_room: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self._by_client: Dict[Tuple[str, str], Dict[WebSocket, ClientConnection]] = {}
+
+    def add(self, connection: ClientConnection):
+        self._by_socket[connection.websocket] = connection
+        self._by_room.setdefault(connection.room_id, {})[connection.websocket] = connection
+        self._by_client.setdefault((connection.room_id, connection.client_id), {})[connection.websocket] = connection
+
+    def remove(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        connection = self._by_socket.pop(websocket, None)
+        if connection is None:
+            return None
+
+        room = self._by_room.get(connection.room_id)
+        if room is not None:
+            room.pop(websocket, None)
+            if not room:
+                del self._by_room[connection.room_id]
+
+        key = (connection.room_id, connection.client_id)
+        client = self._by_client.get(key)
+        if client is not None:
+            client.pop(websocket, None)
+            if not client:
+                del self._by_client[key]
+        return connection
+
+    def get(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        return self._by_socket.get(websocket)
+
+    def in_room(self, room_id: str) -> Iterable[ClientConnection]:
+        return list(self._by_room.get(room_id, {}).values())
+
+    def for_client(self, room_id: str, client_id: str) -> Iterable[ClientConnection]:
+        return list(self._by_client.get((room_id, client_id), {}).values())
+
+    def room_count(self, room_id: str) -> int:
+        return len(self._by_room.get(room_id, ()))
+
+    def all(self) -> Iterable[ClientConnection]:
+        return list(self._by_socket.values())
+
+    def __len__(self) -> int:
+        return len(self._by_socket)
@@ -0,0 +1,16 @@
+import os
+
+from .hashing import jump_hash, shard_for
+
+
+def current_shard() -> tuple:
+    """(index, count) of this process; (0, 1) when not sharded."""
+    return int(os.environ.get("SHARD_INDEX", 0)), int(os.environ.get("SHARD_COUNT", 1))
+
+
+def owns_room(room_id: str) -> bool:
+    index, count = current_shard()
+    return shard_for(room_id, count) == index
+
+
+__all__ = ['jump_hash', 'shard_for', 'current_shard', 'owns_room']
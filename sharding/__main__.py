@@ -0,0 +1,39 @@
+"""
+Sharded deployment: N game processes, each owning the rooms that hash to
+it, behind one router on the public port.
+
+    python -m sharding --shards 4 --port 8000
+"""
+import argparse
+import os
+import signal
+import sys
+
+import uvicorn
+
+from .router import create_router_app
+from .supervisor import SHARD_HOST, start_shards, stop_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--shard-port", type=int, default=9100, help="first shard port (on %s)" % SHARD_HOST)
+    args = parser.parse_args()
+
+    processes = start_shards(args.shards, args.shard_port)
+    backends = [f"http://{SHARD_HOST}:{args.shard_port + i}" for i in range(args.shards)]
+    print(f"🧩 {args.shards} shards on {SHARD_HOST}:{args.shard_port}-{args.shard_port + args.shards - 1}")
+    # uvicorn re-raises SIGTERM after its own shutdown; exit normally instead so the shards are stopped
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        uvicorn.run(create_router_app(backends), host=args.host, port=args.port,
+                    ws_per_message_deflate=False, log_level="warning")
+    finally:
+        stop_shards(processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import hashlib
+
+_MASK64 = (1 << 64) - 1
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach): growing N moves only 1/N of the keys."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK64
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def shard_for(room_id: str, shards: int) -> int:
+    """Owning shard of a room. Stable across processes (unlike hash())."""
+    if shards <= 1:
+        return 0
+    key = int.from_bytes(hashlib.blake2b(room_id.encode("utf-8"), digest_size=8).digest(), "big")
+    return jump_hash(key, shards)
@@ -0,0 +1,149 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import httpx
+import websockets
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from .hashing import shard_for
+
+# /host/{room_id}, /play/{room_id} and /rooms/{room_id}/... go to the room's shard;
+# /admin/... goes to every shard (each drains or reloads only itself);
+# anything else (landing page, static files) can be served by any of them
+_ROOM_PATH = re.compile(r"^/(?:host|play|rooms)/([^/]+)")
+_HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "upgrade", "content-length", "content-encoding"}
+
+
+class ShardRouter:
+    """Front layer: proxies every room's HTTP and WebSocket traffic to the one shard that owns it."""
+
+    def __init__(self, backends: List[str]):
+        self.backends = backends  # http://host:port per shard, in shard order
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def backend_for(self, room_id: str) -> str:
+        return self.backends[shard_for(room_id, len(self.backends))]
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+
+    async def proxy_websocket(self, websocket: WebSocket):
+        room_id = websocket.path_params["room_id"]
+        url = "ws" + self.backend_for(room_id)[len("http"):] + websocket.url.path
+        if websocket.url.query:
+            url += "?" + websocket.url.query
+        offered = websocket.scope.get("subprotocols") or None
+        try:
+            upstream = await websockets.connect(url, subprotocols=offered, compression=None,
+                                                max_size=None, ping_interval=None)
+        except Exception as e:
+            print(f"Shard for room {room_id} unreachable: {e}")
+            await websocket.close(code=1013)
+            return
+
+        await websocket.accept(subprotocol=upstream.subprotocol)
+
+        async def client_to_shard():
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message.get("text") is not None:
+                    await upstream.send(message["text"])
+                elif message.get("bytes") is not None:
+                    await upstream.send(message["bytes"])
+
+        async def shard_to_client():
+            async for frame in upstream:
+                if isinstance(frame, str):
+                    await websocket.send_text(frame)
+                else:
+                    await websocket.send_bytes(frame)
+
+        tasks = [asyncio.ensure_future(client_to_shard()), asyncio.ensure_future(shard_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await upstream.close()
+            try:
+                await websocket.close(code=upstream.close_code or 1000)
+            except (RuntimeError, WebSocketDisconnect):
+                pass  # client already gone
+
+    async def proxy_http(self, request: Request) -> Response:
+        match = _ROOM_PATH.match(request.url.path)
+        backend = self.backend_for(match.group(1)) if match else self.backends[0]
+        upstream = await self.http.request(
+            request.method,
+            backend + request.url.path,
+            params=request.query_params,
+            headers=[(k, v) for k, v in request.headers.items() if k.lower() not in ("host", "content-length")],
+            content=await request.body(),
+        )
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_BY_HOP}
+        return Response(upstream.content, status_code=upstream.status_code, headers=headers)
+
+    async def proxy_admin(self, request: Request) -> JSONResponse:
+        """Fan an admin call out to every shard: {"shards": [{"status", "body"}, ...]}, failing if any shard did."""
+        body = await request.body()
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in ("host", "content-length")]
+
+        async def one(backend):
+            try:
+                upstream = await self.http.request(request.method, backend + request.url.path,
+                                                   params=request.query_params, headers=headers, content=body)
+            except Exception as e:
+                return {"status": 502, "body": {"error": str(e)}}
+            try:
+                data = upstream.json()
+            except ValueError:
+                data = upstream.text
+            return {"status": upstream.status_code, "body": data}
+
+        results = await asyncio.gather(*(one(b) for b in self.backends))
+        failed = [r["status"] for r in results if r["status"] >= 400]
+        return JSONResponse({"shards": results}, status_code=max(failed) if failed else 200)
+
+    async def stats(self, request: Request) -> JSONResponse:
+        async def one(backend):
+            try:
+                return (await self.http.get(backend + "/stats")).json()
+            except Exception as e:
+                return {"error": str(e)}
+        return JSONResponse({"shards": await asyncio.gather(*(one(b) for b in self.backends))})
+
+
+def create_router_app(backends: List[str]) -> Starlette:
+    router = ShardRouter(backends)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await router.close()
+
+    app = Starlette(
+        routes=[
+            WebSocketRoute("/ws/{room_id}/{client_id}", router.proxy_websocket),
+            Route("/stats", router.stats),
+            Route("/admin/{path:path}", router.proxy_admin, methods=["GET", "POST"]),
+            Route("/{path:path}", router.proxy_http, methods=["GET", "POST", "PUT", "DELETE", "HEAD"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.router = router
+    return app
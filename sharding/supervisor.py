@@ -0,0 +1,49 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List
+
+SHARD_HOST = "127.0.0.1"
+# Per-shard files so shards never write each other's rooms
+_PER_SHARD_PATHS = {
+    "SNAPSHOT_PATH": "data/rooms.sqlite3",
+    "EVENT_LOG_PATH": "data/events.sqlite3",
+    "HIBERNATE_PATH": "data/hibernated.sqlite3",
+    "HANDOFF_PATH": "data/handoff.sqlite3",
+}
+
+
+def shard_env(index: int, count: int) -> dict:
+    env = dict(os.environ, SHARD_INDEX=str(index), SHARD_COUNT=str(count))
+    for name, default in _PER_SHARD_PATHS.items():
+        path = os.environ.get(name, default)
+        if path:
+            root, ext = os.path.splitext(path)
+            env[name] = f"{root}.shard{index}{ext}"
+    return env
+
+
+def start_shards(count: int, base_port: int) -> List[subprocess.Popen]:
+    """One uvicorn process per shard on base_port, base_port + 1, ..."""
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", SHARD_HOST, "--port", str(base_port + i),
+             "--ws-per-message-deflate", "false", "--log-level", "warning"],
+            env=shard_env(i, count),
+        )
+        for i in range(count)
+    ]
+
+
+def stop_shards(processes: List[subprocess.Popen], timeout: float = 10.0):
+    for process in processes:
+        if process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        try:
+            process.wait(max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
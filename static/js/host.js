@@ -137,6 +137,8 @@ class SoundManager {
 }
 
 function hostApp(networkIp) {
+    // 再接続をまたいで状態とバージョンを保持する（Alpine のリアクティブ外）
+    const sync = new StateSync();
     return {
         sounds: new SoundManager(),
         initAudio() {
@@ -234,26 +236,43 @@ function hostApp(networkIp) {
 
         connectWebSocket() {
             const proto = window.location.protocol === 'https:' ? 'wss' : 'ws';
-            this.ws = new WebSocket(`${proto}://${window.location.host}/ws/${this.roomId}/${this.clientId}`);
+            this.ws = new WebSocket(`${proto}://${window.location.host}/ws/${this.roomId}/${this.clientId}${sync.resumeQuery()}`, StateSync.protocols());
 
             this.ws.onopen = () => {
                 console.log("Connected to WS");
             };
 
+            // 圧縮フレームの展開は非同期なので、到着順を保って処理する
+            let inbound = Promise.resolve();
+            // デプロイ時はサーバーが RECONNECT で再接続までの待ち時間を指定する
+            let reconnectDelay = 3000;
             this.ws.onmessage = (event) => {
-                try {
-                    const message = JSON.parse(event.data);
+                inbound = inbound.then(() => StateSync.frameText(event.data)).then((text) => {
+                    const message = JSON.parse(text);
                     if (message.type === 'STATE_UPDATE') {
-                        this.updateState(message.data);
+                        const state = sync.apply(message);
+                        if (state) {
+                            this.updateState(state);
+                        } else if (sync.shouldRequestResync()) {
+                            this.sendMessage('RESYNC');
+                        }
+                    } else if (message.type === 'SESSION') {
+                        sync.session(message.data);
+                    } else if (message.type === 'RECONNECT') {
+                        sync.session(message.data);
+                        reconnectDelay = message.data.retry_ms;
+                    } else if (message.type === 'PING') {
+                        this.sendMessage('PONG');
                     }
-                } catch (e) {
+                }).catch((e) => {
                     console.error("WS Message Error:", e);
-                }
+                });
             };
 
             this.ws.onclose = () => {
                 console.log("Disconnected");
-                setTimeout(() => this.connectWebSocket(), 3000);
+                // 処理待ちのメッセージ（RECONNECT など）を先に反映してから再接続
+                inbound.then(() => setTimeout(() => this.connectWebSocket(), reconnectDelay));
             };
         },
 
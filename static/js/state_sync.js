@@ -0,0 +1,112 @@
+// STATE_UPDATE の差分同期
+// サーバーは version と、前回送ったバージョン (base_version) からの JSON Patch を送る。
+// 手元のバージョンと合わなければ RESYNC を要求してフルスナップショットを受け取る。
+// data/patch は全プレイヤー共通の部分。自分だけの秘密（お題・役職など）は
+// 毎回 private として届き、{セクション: {フィールド: 値}} で上書きする。
+// 再接続時は SESSION で受け取ったトークンと手元の version を送り、
+// 取りこぼした差分だけを受け取る（インスタンスは再接続をまたいで使い回す）。
+class StateSync {
+    constructor() {
+        this.version = null;
+        this.state = null;
+        this.resyncRequested = false;
+        this.resumeToken = null;
+    }
+
+    // SESSION メッセージ
+    session(data) {
+        this.resumeToken = data.resume_token;
+    }
+
+    // WebSocket URL に付けるクエリ（再開できなければ空文字）
+    resumeQuery() {
+        if (!this.resumeToken || this.version === null) return '';
+        return `?resume=${encodeURIComponent(this.resumeToken)}&v=${this.version}`;
+    }
+
+    // 適用後のフル状態を返す。適用できなければ null
+    apply(message) {
+        if (message.data !== undefined) {
+            this.state = message.data;
+            this.version = message.version;
+            this.resyncRequested = false;
+            return StateSync.withPrivate(this.state, message.private);
+        }
+        if (this.state === null || message.base_version !== this.version) {
+            return null;
+        }
+        let state = this.state;
+        for (const op of message.patch) {
+            state = StateSync.applyOp(state, op);
+        }
+        this.state = state;
+        this.version = message.version;
+        return StateSync.withPrivate(state, message.private);
+    }
+
+    static withPrivate(state, overlay) {
+        if (!overlay) return state;
+        const merged = Object.assign({}, state);
+        for (const [section, fields] of Object.entries(overlay)) {
+            merged[section] = Object.assign({}, merged[section], fields);
+        }
+        return merged;
+    }
+
+    // 対応ブラウザでは大きなフレームの deflate 圧縮を要求する
+    // （DecompressionStream があっても 'deflate-raw' 非対応のブラウザがあるので実際に作って確かめる）
+    static protocols() {
+        if (typeof DecompressionStream === 'undefined') return [];
+        try {
+            new DecompressionStream('deflate-raw');
+        } catch (e) {
+            return [];
+        }
+        return ['sympathy.deflate'];
+    }
+
+    // テキストフレームはそのまま、バイナリ（圧縮）フレームは展開して文字列にする
+    static frameText(data) {
+        if (typeof data === 'string') {
+            return Promise.resolve(data);
+        }
+        const stream = data.stream().pipeThrough(new DecompressionStream('deflate-raw'));
+        return new Response(stream).text();
+    }
+
+    // 同じ欠落に対して RESYNC を連打しない
+    shouldRequestResync() {
+        if (this.resyncRequested) return false;
+        this.resyncRequested = true;
+        return true;
+    }
+
+    // 変更されたパス上のオブジェクトだけをコピーする（旧状態は書き換えない）
+    static applyOp(doc, op) {
+        if (op.path === '') {
+            return op.value;
+        }
+        const tokens = op.path.slice(1).split('/').map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+        return StateSync.setIn(doc, tokens, 0, op);
+    }
+
+    static setIn(node, tokens, i, op) {
+        const isArray = Array.isArray(node);
+        const copy = isArray ? node.slice() : Object.assign({}, node);
+        const key = isArray ? (tokens[i] === '-' ? copy.length : parseInt(tokens[i], 10)) : tokens[i];
+
+        if (i < tokens.length - 1) {
+            copy[key] = StateSync.setIn(node[key], tokens, i + 1, op);
+            return copy;
+        }
+
+        if (op.op === 'remove') {
+            if (isArray) { copy.splice(key, 1); } else { delete copy[key]; }
+        } else if (op.op === 'add' && isArray) {
+            copy.splice(key, 0, op.value);
+        } else {
+            copy[key] = op.value;
+        }
+        return copy;
+    }
+}
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from .base import RoomStore, InMemoryRoomStore
+from .handoff import Handoff
+from .hibernation import Hibernator
+from .lifecycle import RoomLifecycle
+from .shared import RedisRoomStore
+from .snapshots import SnapshotStore
+
+
+def create_room_store(url: Optional[str] = None, hibernator: Optional[Hibernator] = None) -> RoomStore:
+    """In-memory unless a Redis URL is given (needed to run more than one worker)."""
+    if not url:
+        return InMemoryRoomStore(hibernator)
+    return RedisRoomStore.from_url(url)
+
+
+__all__ = [
+    'RoomStore', 'InMemoryRoomStore', 'RedisRoomStore', 'RoomLifecycle', 'SnapshotStore', 'Hibernator',
+    'Handoff', 'create_room_store',
+]
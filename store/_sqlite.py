@@ -0,0 +1,14 @@
+import os
+import sqlite3
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """WAL-mode connection usable from worker threads (callers serialise access)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(schema)
+    return db
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Optional
+
+from models import Room, rooms, get_or_create_room
+from .hibernation import Hibernator
+
+# Called with room_id when another worker has changed a room this worker holds
+RemoteUpdate = Callable[[str], Awaitable[None]]
+
+
+class RoomStore(ABC):
+    """
+    Where the authoritative copy of each Room lives. The global rooms dict
+    (get_or_create_room) is always the working copy for this process; a
+    store fills it before a room is read and persists it after a change.
+    """
+
+    async def start(self, on_remote_update: RemoteUpdate):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def load(self, room_id: str) -> Room:
+        """Bring the local copy of the room up to date and return it."""
+
+    @abstractmethod
+    def transaction(self, room_id: str) -> AsyncContextManager[Room]:
+        """
+        Exclusive access to the room for one message (an async context
+        manager yielding the Room). If room.version moved inside the block
+        the change is persisted on exit.
+        """
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class InMemoryRoomStore(RoomStore):
+    """
+    Single process: the rooms dict is the working copy and the room actor
+    already serialises access. Rooms paged out to the hibernator are
+    brought back transparently on first access.
+    """
+
+    def __init__(self, hibernator: Optional[Hibernator] = None):
+        self.hibernator = hibernator
+
+    async def load(self, room_id: str) -> Room:
+        if room_id not in rooms and self.hibernator is not None and room_id in self.hibernator:
+            room = await self.hibernator.wake(room_id)
+            if room is not None:
+                rooms.setdefault(room_id, room)
+        return get_or_create_room(room_id)
+
+    @asynccontextmanager
+    async def transaction(self, room_id: str) -> AsyncIterator[Room]:
+        yield await self.load(room_id)
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "hibernation": self.hibernator is not None}
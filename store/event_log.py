@@ -0,0 +1,185 @@
+"""
+Per-room log of every accepted message, for replay.
+
+    python -m store.event_log data/events.sqlite3 ROOM_ID [VERSION]
+
+prints the room's events and the state rebuilt from them (up to VERSION).
+Questions and topics come from the pack at CONTENT_PACK_PATH (default
+data/content.pack), which must be the pack the game was started with.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from game_engine.events import RoomEvent
+from models import Room
+from ._sqlite import connect
+
+if TYPE_CHECKING:
+    from game_engine import GameEngine
+
+EVENT_FLUSH_INTERVAL = 1.0
+# Flush early once this many events are buffered
+EVENT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    room_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    at REAL NOT NULL,
+    seed INTEGER NOT NULL,
+    client_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    payload TEXT,
+    content_id TEXT
+);
+CREATE INDEX IF NOT EXISTS events_room ON events (room_id, id);
+"""
+
+
+class EventLog:
+    """
+    Append-only SQLite log fed by GameEngine.on_event. Events are buffered
+    in memory and written in batches from a worker thread, every
+    flush_interval seconds or as soon as batch_size are waiting.
+    """
+
+    def __init__(self, path: str, flush_interval: float = EVENT_FLUSH_INTERVAL, batch_size: int = EVENT_BATCH_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer: List[tuple] = []
+        self.written = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = connect(self.path, _SCHEMA)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(events)")}
+            if "content_id" not in columns:
+                # Logs written before START_GAME recorded its pack
+                self._db.execute("ALTER TABLE events ADD COLUMN content_id TEXT")
+        return self._db
+
+    def record(self, event: RoomEvent):
+        # The payload is encoded now: handlers may keep a reference to it
+        payload = json.dumps(event.payload, ensure_ascii=False, separators=(",", ":")) if event.payload else None
+        self.buffer.append((event.room_id, event.version, event.at, event.seed,
+                            event.client_id, event.msg_type, payload, event.content_id))
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _write(self, rows: List[tuple]):
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT INTO events (room_id, version, at, seed, client_id, type, payload, content_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    async def flush(self) -> int:
+        rows, self.buffer = self.buffer, []
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+            self.written += len(rows)
+        return len(rows)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Event log flush failed: {e}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def read(self, room_id: str) -> List[RoomEvent]:
+        """All flushed events of a room in the order they were applied."""
+        with self._db_lock:
+            rows = self._connect().execute(
+                "SELECT room_id, version, at, seed, client_id, type, payload, content_id FROM events "
+                "WHERE room_id = ? ORDER BY id", (room_id,)).fetchall()
+        return [RoomEvent(*row[:6], json.loads(row[6]) if row[6] else {}, row[7]) for row in rows]
+
+    def stats(self) -> dict:
+        return {"path": self.path, "buffered": len(self.buffer), "written": self.written}
+
+
+def replay(engine: 'GameEngine', room_id: str, events: Iterable[RoomEvent], until: Optional[int] = None) -> Room:
+    """
+    Rebuild a room by applying its logged events to a fresh Room. Only the
+    last life of the room is replayed (from its last version-1 event). The
+    engine must have the pack each game was started with (a different one
+    raises ValueError rather than drawing other questions) and should have
+    no on_event listeners, or the replay is logged again.
+    """
+    events = list(events)
+    start = 0
+    for i, event in enumerate(events):
+        if event.version == 1:
+            start = i
+
+    room = Room(room_id=room_id)
+    for event in events[start:]:
+        if until is not None and event.version > until:
+            break
+        changed = engine.process_message(room, event.client_id, event.msg_type, event.payload,
+                                         seed=event.seed, now=event.at)
+        if not changed or room.version != event.version:
+            raise ValueError(f"Replay of room {room_id} diverged at version {event.version} ({event.msg_type})")
+        if event.content_id is not None and room.content_id != event.content_id:
+            raise ValueError(f"Room {room_id} started a game with content pack {event.content_id} at version "
+                             f"{event.version}, but the replay has {room.content_id}")
+    return room
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    from content import DEFAULT_PACK_PATH, ContentPack
+    from game_engine import GameEngine
+
+    # Opened as is: rebuilding it from newer CSVs would give another pack
+    pack = ContentPack.open(os.environ.get("CONTENT_PACK_PATH") or DEFAULT_PACK_PATH)
+    log = EventLog(sys.argv[1])
+    room_id = sys.argv[2]
+    until = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    events = log.read(room_id)
+    for event in events:
+        if until is not None and event.version > until:
+            break
+        stamp = time.strftime("%H:%M:%S", time.localtime(event.at))
+        print(f"v{event.version:<5} {stamp} {event.client_id:<12} {event.msg_type} {event.payload or ''}")
+    room = replay(GameEngine(pack), room_id, events, until)
+    print(room.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Room
+from ._sqlite import connect
+
+# Rows older than this are not adopted (a stale handoff from an old deploy)
+HANDOFF_TTL = 10 * 60
+# How often a running process looks for rooms handed off after it started (seconds)
+HANDOFF_POLL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS handoff (
+    room_id TEXT PRIMARY KEY,
+    saved_at REAL NOT NULL,
+    data BLOB NOT NULL,
+    sessions TEXT NOT NULL
+);
+"""
+
+
+class Handoff:
+    """
+    Rooms passed from a draining process to its successor. The old process
+    writes every room (with its resume tokens) in one batch after its actors
+    have stopped. The successor usually starts first (zero-downtime deploy),
+    so besides adopting everything at startup it polls for rows every
+    poll_interval, and adopt() takes a single room straight away when a
+    client arrives for it, so clients told to reconnect can resume where
+    they left off. A process that has handed off never adopts again.
+    """
+
+    def __init__(self, path: str, ttl: float = HANDOFF_TTL, poll_interval: float = HANDOFF_POLL):
+        self.path = path
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.saved = 0
+        self.adopted = 0
+        # Called with (room_id, {client_id: resume token}) when a room is adopted
+        self.on_adopt: List[Callable[[str, Dict[str, str]], None]] = []
+        # Set once this process has saved its rooms (it is draining)
+        self.handed_off = False
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = connect(self.path, _SCHEMA)
+        return self._db
+
+    def _write(self, rows: List[Tuple[str, float, bytes, str]]):
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO handoff (room_id, saved_at, data, sessions) VALUES (?, ?, ?, ?)",
+                               rows)
+
+    async def save(self, rooms: Iterable[Room], sessions: Dict[str, Dict[str, str]]) -> int:
+        """Hand off rooms; serialised here (consistent), written from a worker thread."""
+        self.handed_off = True
+        self.stop()
+        now = time.time()
+        rows = [(room.room_id, now, zlib.compress(room.model_dump_json().encode(), 1),
+                 json.dumps(sessions.get(room.room_id, {})))
+                for room in rooms]
+        await asyncio.to_thread(self._write, rows)
+        self.saved += len(rows)
+        return len(rows)
+
+    def _take(self, room_id: Optional[str] = None) -> List[Tuple[float, bytes, str]]:
+        """Remove and return the rows (all, or one room's); read-only when there are none."""
+        where, args = ("WHERE room_id = ?", (room_id,)) if room_id is not None else ("", ())
+        with self._db_lock:
+            db = self._connect()
+            rows = db.execute(f"SELECT saved_at, data, sessions FROM handoff {where}", args).fetchall()
+            if rows:
+                with db:
+                    db.execute(f"DELETE FROM handoff {where}", args)
+        return rows
+
+    def _adopt_rows(self, rows: List[Tuple[float, bytes, str]], rooms: Dict[str, Room]) -> int:
+        now = time.time()
+        adopted = 0
+        for saved_at, data, sessions in rows:
+            if now - saved_at > self.ttl:
+                continue
+            room = Room.model_validate_json(zlib.decompress(data))
+            # A snapshot copy, or an empty room created before the row arrived, can only be older
+            local = rooms.get(room.room_id)
+            if local is not None and local.version > room.version:
+                continue
+            rooms[room.room_id] = room
+            for callback in self.on_adopt:
+                callback(room.room_id, json.loads(sessions))
+            adopted += 1
+        self.adopted += adopted
+        return adopted
+
+    async def restore(self, rooms: Dict[str, Room]) -> int:
+        """
+        Adopt every handed-off room into the rooms dict and clear the store.
+        Returns the number adopted.
+        """
+        if self.handed_off:
+            return 0
+        return self._adopt_rows(await asyncio.to_thread(self._take), rooms)
+
+    async def adopt(self, room_id: str, rooms: Dict[str, Room]) -> bool:
+        """Adopt this room if a draining process handed it off (call before a client is let in)."""
+        if self.handed_off:
+            return False
+        return self._adopt_rows(await asyncio.to_thread(self._take, room_id), rooms) > 0
+
+    def start(self, rooms: Dict[str, Room]):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run(rooms))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, rooms: Dict[str, Room]):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                adopted = await self.restore(rooms)
+                if adopted:
+                    print(f"📦 Adopted {adopted} rooms from {self.path}")
+            except Exception as e:
+                print(f"Handoff poll failed: {e}")
+
+    def close(self):
+        self.stop()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "saved": self.saved, "adopted": self.adopted}
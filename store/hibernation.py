@@ -0,0 +1,163 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set
+
+from models import Room, Phase
+from ._sqlite import connect
+
+# Only rooms between games are paged out; a game in progress stays in memory
+HIBERNATE_PHASES = (Phase.LOBBY, Phase.RESULT)
+# Empty rooms are paged out after this long without activity (seconds)
+HIBERNATE_AFTER = 2 * 60
+# Paged-out rooms nobody comes back to are dropped after this long
+HIBERNATE_TTL = 24 * 60 * 60
+FLUSH_INTERVAL = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hibernated (
+    room_id TEXT PRIMARY KEY,
+    saved_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hibernated_saved_at ON hibernated (saved_at);
+"""
+
+
+class Hibernator:
+    """
+    Cold tier for idle rooms: a local SQLite cache of compressed room JSON.
+    hibernate() takes the room out of memory at once; the bytes wait in
+    `pending` until the next flush writes them from a worker thread. wake()
+    brings a room back (from pending or disk) and removes it from the cache.
+    Which rooms are on disk is kept in memory, so misses cost no I/O.
+    """
+
+    def __init__(self, path: str, ttl: float = HIBERNATE_TTL, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        # room_id -> compressed JSON not yet written
+        self.pending: Dict[str, bytes] = {}
+        # room_ids on disk
+        self.on_disk: Set[str] = set()
+        self.hibernated = 0
+        self.woken = 0
+        self.expired = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # room_id -> wake in progress, shared by concurrent callers
+        self._waking: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = connect(self.path, _SCHEMA)
+        return self._db
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self.pending or room_id in self.on_disk or room_id in self._waking
+
+    def __len__(self) -> int:
+        return len(self.pending) + len(self.on_disk - self.pending.keys())
+
+    def can_hibernate(self, room: Room) -> bool:
+        return room.phase in HIBERNATE_PHASES
+
+    def hibernate(self, room: Room):
+        """Serialise the room; the caller drops it from memory."""
+        self.pending[room.room_id] = zlib.compress(room.model_dump_json().encode(), 1)
+        self.hibernated += 1
+
+    async def wake(self, room_id: str) -> Optional[Room]:
+        task = self._waking.get(room_id)
+        if task is None:
+            task = asyncio.ensure_future(self._wake(room_id))
+            self._waking[room_id] = task
+            task.add_done_callback(lambda _: self._waking.pop(room_id, None))
+        return await task
+
+    async def _wake(self, room_id: str) -> Optional[Room]:
+        data = self.pending.pop(room_id, None)
+        if room_id in self.on_disk:
+            self.on_disk.discard(room_id)
+            stored = await asyncio.to_thread(self._take, room_id)
+            if data is None:
+                data = stored
+        if data is None:
+            return None
+        self.woken += 1
+        return Room.model_validate_json(zlib.decompress(data))
+
+    def _take(self, room_id: str) -> Optional[bytes]:
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                row = db.execute("SELECT data FROM hibernated WHERE room_id = ?", (room_id,)).fetchone()
+                db.execute("DELETE FROM hibernated WHERE room_id = ?", (room_id,))
+        return row[0] if row else None
+
+    def _write(self, rows: Dict[str, bytes]) -> List[str]:
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO hibernated (room_id, saved_at, data) VALUES (?, ?, ?)",
+                               [(room_id, now, data) for room_id, data in rows.items()])
+                expired = [row[0] for row in db.execute(
+                    "SELECT room_id FROM hibernated WHERE saved_at < ?", (now - self.ttl,))]
+                db.execute("DELETE FROM hibernated WHERE saved_at < ?", (now - self.ttl,))
+        return expired
+
+    def _load_index(self) -> Set[str]:
+        with self._db_lock:
+            return {row[0] for row in self._connect().execute("SELECT room_id FROM hibernated")}
+
+    async def flush(self):
+        rows = dict(self.pending)
+        expired = await asyncio.to_thread(self._write, rows)
+        for room_id, data in rows.items():
+            # A room woken (or hibernated again) meanwhile is not ours to move
+            if self.pending.get(room_id) is data:
+                del self.pending[room_id]
+                self.on_disk.add(room_id)
+            elif room_id not in self.pending:
+                await asyncio.to_thread(self._take, room_id)
+            else:
+                self.on_disk.add(room_id)  # stale row; the pending copy wins and replaces it
+        self.on_disk.difference_update(expired)
+        self.expired += len(expired)
+
+    async def start(self):
+        if self._task is None:
+            self.on_disk = await asyncio.to_thread(self._load_index)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Hibernation flush failed: {e}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "rooms": len(self),
+            "hibernated": self.hibernated,
+            "woken": self.woken,
+            "expired": self.expired,
+        }
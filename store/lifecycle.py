@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from models import Room
+from .hibernation import Hibernator, HIBERNATE_AFTER
+
+# Rooms with no sockets and no activity for this long are evicted (seconds)
+IDLE_TTL = 30 * 60
+# Global budget: beyond this many rooms the least recently used empty ones go
+MAX_ROOMS = 5000
+SWEEP_INTERVAL = 60.0
+
+
+class RoomLifecycle:
+    """
+    Tracks last activity per room (in LRU order) and evicts rooms from the
+    global rooms dict: idle and empty for idle_ttl, or least recently used
+    empty rooms once there are more than max_rooms. Rooms that still have
+    sockets are never evicted. With a hibernator, empty rooms between games
+    are paged out to it instead (after hibernate_after, or when over budget).
+    """
+
+    def __init__(self, rooms: Dict[str, Room], connection_count: Callable[[str], int],
+                 idle_ttl: float = IDLE_TTL, max_rooms: int = MAX_ROOMS, sweep_interval: float = SWEEP_INTERVAL,
+                 hibernator: Optional[Hibernator] = None, hibernate_after: float = HIBERNATE_AFTER):
+        self.rooms = rooms
+        self.connection_count = connection_count
+        self.idle_ttl = idle_ttl
+        self.max_rooms = max_rooms
+        self.sweep_interval = sweep_interval
+        self.hibernator = hibernator
+        self.hibernate_after = hibernate_after
+        # room_id -> monotonic time of last activity, least recent first
+        self.last_activity: "OrderedDict[str, float]" = OrderedDict()
+        # Called with room_id after a room has been evicted
+        self.on_evict: List[Callable[[str], None]] = []
+        self.evicted = {"idle": 0, "budget": 0, "hibernated": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, room_id: str):
+        is_new = room_id not in self.last_activity
+        self.last_activity[room_id] = time.monotonic()
+        self.last_activity.move_to_end(room_id)
+        if is_new and len(self.rooms) > self.max_rooms:
+            # The caller is about to use this room (often before its socket is registered)
+            self._enforce_budget(keep=room_id)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Room sweep failed: {e}")
+
+    def sweep(self) -> List[str]:
+        """Evict idle empty rooms, then enforce the room budget. Returns evicted ids."""
+        now = time.monotonic()
+        # Rooms nobody has touched yet start their idle clock now
+        for room_id in self.rooms:
+            if room_id not in self.last_activity:
+                self.last_activity[room_id] = now
+
+        threshold = min(self.idle_ttl, self.hibernate_after) if self.hibernator is not None else self.idle_ttl
+        evicted = []
+        for room_id, last in list(self.last_activity.items()):
+            idle = now - last
+            if idle < threshold:
+                break  # LRU order: everything after is more recent
+            if self.connection_count(room_id):
+                continue
+            if idle >= self.hibernate_after and self._can_hibernate(room_id):
+                self.evict(room_id, "hibernated")
+            elif idle >= self.idle_ttl:
+                self.evict(room_id, "idle")
+            else:
+                continue
+            evicted.append(room_id)
+        return evicted + self._enforce_budget()
+
+    def _enforce_budget(self, keep: Optional[str] = None) -> List[str]:
+        evicted = []
+        for room_id in list(self.last_activity):
+            if len(self.rooms) <= self.max_rooms:
+                break
+            if room_id != keep and self.connection_count(room_id) == 0:
+                self.evict(room_id, "hibernated" if self._can_hibernate(room_id) else "budget")
+                evicted.append(room_id)
+        return evicted
+
+    def _can_hibernate(self, room_id: str) -> bool:
+        room = self.rooms.get(room_id)
+        return self.hibernator is not None and room is not None and self.hibernator.can_hibernate(room)
+
+    def evict(self, room_id: str, reason: str):
+        if reason == "hibernated":
+            self.hibernator.hibernate(self.rooms[room_id])
+        self.rooms.pop(room_id, None)
+        self.last_activity.pop(room_id, None)
+        self.evicted[reason] += 1
+        for callback in self.on_evict:
+            callback(room_id)
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "max_rooms": self.max_rooms,
+            "idle_ttl": self.idle_ttl,
+            "evicted": dict(self.evicted),
+            "hibernation": self.hibernator.stats() if self.hibernator is not None else None,
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed when ROOM_STORE_URL points at Redis
+    aioredis = None
+
+from models import Room, rooms, get_or_create_room
+from .base import RoomStore, RemoteUpdate
+
+CHANNEL = "sympathy:rooms"
+KEY_PREFIX = "sympathy:room:"
+# Shared copies outlive the local idle eviction so a room can move between workers
+KEY_TTL = 6 * 60 * 60
+LOCK_TIMEOUT = 5.0
+LOCK_POLL = 0.005
+
+# Delete the lock only if we still hold it
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisRoomStore(RoomStore):
+    """
+    Rooms shared between workers through Redis (or anything speaking its
+    protocol). Each room is one JSON value, with its version in a key of
+    its own so a worker whose copy is already current skips fetching and
+    parsing the room; a message is applied under a per-room lock against
+    the latest copy, written back, and announced on a pub/sub channel so
+    every worker holding sockets for that room refreshes its copy and
+    broadcasts to them.
+    """
+
+    def __init__(self, client, key_ttl: int = KEY_TTL, lock_timeout: float = LOCK_TIMEOUT):
+        self.client = client
+        self.key_ttl = key_ttl
+        self.lock_timeout = lock_timeout
+        self.worker_id = uuid.uuid4().hex
+        self.remote_updates = 0
+        # Loads answered by the version key alone vs. full fetch + parse
+        self.loads_current = 0
+        self.loads_fetched = 0
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RedisRoomStore':
+        """redis://host:port/db, rediss://... or unix:///path/to/socket"""
+        if aioredis is None:
+            raise RuntimeError("A shared room store needs the 'redis' package (pip install redis)")
+        return cls(aioredis.from_url(url), **kwargs)
+
+    def _key(self, room_id: str) -> str:
+        return KEY_PREFIX + room_id
+
+    def _version_key(self, room_id: str) -> str:
+        return KEY_PREFIX + room_id + ":version"
+
+    async def start(self, on_remote_update: RemoteUpdate):
+        if self._listener is not None:
+            return
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(CHANNEL)
+        self._listener = asyncio.ensure_future(self._listen(on_remote_update))
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await self.client.aclose()
+
+    async def _listen(self, on_remote_update: RemoteUpdate):
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                event = json.loads(message["data"])
+                if event["origin"] == self.worker_id:
+                    continue
+                room_id = event["room_id"]
+                # Rooms this worker has never loaded are fetched on first use
+                local = rooms.get(room_id)
+                if local is None or local.version >= event["version"]:
+                    continue
+                await self.load(room_id)
+                self.remote_updates += 1
+                await on_remote_update(room_id)
+            except Exception as e:
+                print(f"Room update from another worker failed: {e}")
+
+    async def load(self, room_id: str) -> Room:
+        local = rooms.get(room_id)
+        if local is not None:
+            shared_version = await self.client.get(self._version_key(room_id))
+            # No version key: never saved, or written before it existed; fetch to be sure
+            if shared_version is not None and int(shared_version) <= local.version:
+                self.loads_current += 1
+                return local
+        self.loads_fetched += 1
+        data = await self.client.get(self._key(room_id))
+        if data is not None:
+            local = rooms.get(room_id)
+            shared = Room.model_validate_json(data)
+            if local is None or shared.version > local.version:
+                rooms[room_id] = shared
+        return get_or_create_room(room_id)
+
+    async def _lock(self, room_id: str) -> str:
+        key = self._key(room_id) + ":lock"
+        token = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout
+        while not await self.client.set(key, token, nx=True, px=int(self.lock_timeout * 1000)):
+            if loop.time() > deadline:
+                raise TimeoutError(f"Room {room_id} is locked by another worker")
+            await asyncio.sleep(LOCK_POLL)
+        return token
+
+    async def _unlock(self, room_id: str, token: str):
+        await self.client.eval(_UNLOCK_SCRIPT, 1, self._key(room_id) + ":lock", token)
+
+    async def save(self, room: Room):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(room.room_id), room.model_dump_json(), ex=self.key_ttl)
+            pipe.set(self._version_key(room.room_id), room.version, ex=self.key_ttl)
+            pipe.publish(CHANNEL, json.dumps({
+                "room_id": room.room_id,
+                "version": room.version,
+                "origin": self.worker_id,
+            }))
+            await pipe.execute()
+
+    @asynccontextmanager
+    async def transaction(self, room_id: str) -> AsyncIterator[Room]:
+        token = await self._lock(room_id)
+        try:
+            room = await self.load(room_id)
+            version = room.version
+            yield room
+            if room.version != version:
+                await self.save(room)
+        finally:
+            await self._unlock(room_id, token)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "worker_id": self.worker_id,
+            "remote_updates": self.remote_updates,
+            "loads_current": self.loads_current,
+            "loads_fetched": self.loads_fetched,
+        }
@@ -0,0 +1,75 @@
+"""
+Deploy handoff when the new process is already running before the old one
+drains (zero-downtime deploy): each side has its own rooms dict and its
+own connection to the shared HANDOFF_PATH file.
+"""
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models import Room  # noqa: E402
+from store.handoff import Handoff  # noqa: E402
+
+
+def make_room(room_id: str, players: int) -> Room:
+    room = Room(room_id=room_id)
+    for i in range(players):
+        room.add_player(f"P{i}", f"player {i}")
+        room.version += 1
+    return room
+
+
+def test_drain_after_successor_started(tmp_path):
+    path = str(tmp_path / "handoff.sqlite3")
+
+    async def run():
+        # The new process starts first: nothing to adopt yet, so it keeps polling
+        new_rooms = {}
+        new = Handoff(path, poll_interval=0.05)
+        sessions = {}
+        new.on_adopt.append(lambda room_id, tokens: sessions.__setitem__(room_id, tokens))
+        assert await new.restore(new_rooms) == 0
+        new.start(new_rooms)
+        # A page load for ROOM2 reached the new process before the drain
+        new_rooms["ROOM2"] = Room(room_id="ROOM2")
+
+        # Then the old process drains
+        old_rooms = {"ROOM1": make_room("ROOM1", 3), "ROOM2": make_room("ROOM2", 2)}
+        old = Handoff(path)
+        assert await old.save(old_rooms.values(), {"ROOM1": {"P0": "token-0"}}) == 2
+        # ...and never takes its own rooms back
+        assert await old.adopt("ROOM1", {}) is False
+
+        # A client told to RECONNECT arrives before the next poll
+        assert await new.adopt("ROOM1", new_rooms) is True
+        assert sorted(new_rooms["ROOM1"].players) == ["P0", "P1", "P2"]
+        assert sessions["ROOM1"] == {"P0": "token-0"}
+
+        # The poll adopts the rest, over the empty copy created before the drain
+        await asyncio.sleep(0.2)
+        assert sorted(new_rooms["ROOM2"].players) == ["P0", "P1"]
+        assert new.adopted == 2
+        new.close()
+        old.close()
+
+    asyncio.run(run())
+
+
+def test_newer_local_room_is_kept(tmp_path):
+    path = str(tmp_path / "handoff.sqlite3")
+
+    async def run():
+        old = Handoff(path)
+        await old.save([make_room("ROOM1", 1)], {})
+        new = Handoff(path)
+        local = make_room("ROOM1", 4)
+        new_rooms = {"ROOM1": local}
+        assert await new.adopt("ROOM1", new_rooms) is False
+        assert new_rooms["ROOM1"] is local
+        new.close()
+        old.close()
+
+    asyncio.run(run())